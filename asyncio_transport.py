@@ -0,0 +1,146 @@
+"""
+AsyncioTransport: every port is served by one shared asyncio loop that
+watches the port's file descriptor and writes without blocking. POSIX only,
+since it relies on selectable serial file descriptors.
+
+Kept apart from transport.py so that asyncio is only imported when this
+backend is used.
+"""
+import asyncio
+import os
+import threading
+import time
+
+from transport import Transport
+
+
+class EventLoopThread:
+    """One asyncio loop running in a daemon thread, shared by every
+    AsyncioTransport."""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        # Selector loop: add_reader/add_writer on serial fds.
+        self.loop = asyncio.SelectorEventLoop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def get(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+
+class AsyncioTransport(Transport):
+    """Serve the port from the shared event loop without blocking it."""
+
+    def __init__(self, sender):
+        super().__init__(sender)
+        self.loop = None
+        self.future = None
+        self.event = None
+        self.fd = None
+        self.worked = False     # the current link wrote or read successfully
+
+    def start(self):
+        self.loop = EventLoopThread.get().loop
+        self.future = asyncio.run_coroutine_threadsafe(self._serve(), self.loop)
+
+    def wake(self):
+        if self.event is not None:
+            self.loop.call_soon_threadsafe(self.event.set)
+
+    def join(self, timeout=None):
+        if self.future is None:
+            return
+        try:
+            self.future.result(timeout=timeout)
+        except Exception:
+            # Still stuck (e.g. in a write to a stalled port): cancel it.
+            self.future.cancel()
+
+    async def _serve(self):
+        """(Re)open the port and serve it until the sender stops."""
+        sender = self.sender
+        self.event = asyncio.Event()
+        delays = sender._backoff()
+        while sender.running:
+            if await self.loop.run_in_executor(None, sender._open_port, 0):
+                self.worked = False
+                self.fd = sender.ser.fileno()
+                self.loop.add_reader(self.fd, self._on_readable)
+                try:
+                    await self._write_loop()
+                finally:
+                    self.loop.remove_reader(self.fd)
+                    sender.ser.close()
+                if self.worked:
+                    delays = sender._backoff()
+            await self._sleep(next(delays))
+        sender.log_debug("SerialSender task exited")
+
+    async def _sleep(self, seconds):
+        """Sleep, but return early if the sender stops."""
+        deadline = self.loop.time() + seconds
+        while self.sender.running and (left := deadline - self.loop.time()) > 0:
+            self.event.clear()
+            try:
+                await asyncio.wait_for(self.event.wait(), left)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _write_loop(self):
+        """Send messages as they become due, until stopped or the link fails."""
+        sender = self.sender
+        while sender._serving():
+            self.event.clear()
+            with sender.cond:
+                msg, wait = sender._next_due()
+            if msg is None:
+                try:
+                    await asyncio.wait_for(self.event.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            frame = sender._frame(msg)
+            write_start = time.monotonic()
+            try:
+                await self._write(frame)
+            except Exception as e:
+                sender._fail("write", e, msg)
+                break
+            self.worked = True
+            sender._sent(msg, write_start, len(frame))
+
+    async def _write(self, data):
+        """Write all of data, yielding to the loop while the port is full."""
+        view = memoryview(data)
+        while view:
+            try:
+                view = view[os.write(self.fd, view):]
+            except BlockingIOError:
+                pass
+            if view:
+                writable = self.loop.create_future()
+                self.loop.add_writer(self.fd, lambda: writable.done() or writable.set_result(None))
+                try:
+                    await writable
+                finally:
+                    self.loop.remove_writer(self.fd)
+
+    def _on_readable(self):
+        sender = self.sender
+        try:
+            data = sender.ser.read(max(1, sender.ser.in_waiting))
+        except Exception as e:
+            self.loop.remove_reader(self.fd)
+            if sender._serving():
+                sender._fail("read", e)
+            return
+        if data:
+            self.worked = True
+        sender._received(data)
@@ -0,0 +1,1001 @@
+"""
+Measurements for the serial send path, run against pseudo-terminals instead
+of a real board (POSIX only):
+
+    python benchmark.py            # run every benchmark
+    python benchmark.py idle       # run a single one
+
+Each benchmark prints its numbers and returns False if a limit is exceeded;
+the script then exits non-zero. Behaviour that needs no clock or port is
+covered by the unit tests in tests/ (python -m pytest).
+"""
+import json
+import os
+import random
+import select
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from datetime import datetime, timedelta
+
+from board_simulator import BoardSimulator
+from configuration import BAUD_RATES, Configuration
+from day_schedule import DaySchedule, Round
+import daemon
+from config_store import ConfigStore, load_config
+from custom_coder import encode_block, encode_compact, encode_end, encode_frames, encode_message
+from pty_port import PtyPort
+from reply_parser import ReplyParser
+from serial_sender import SerialSender
+from session_log import IN, OUT, SessionReader, SessionRecorder, replay
+from telemetry import LinkTelemetry
+from sender_manager import SenderManager
+
+BACKENDS = ["thread", "asyncio"]
+
+
+def sample_configuration(period=5):
+    config = Configuration()
+    config.series, config.group, config.a_right, config.period = "12", "A", True, period
+    config.open_time = datetime(2025, 8, 30, 10, 0)
+    config.close_time = datetime(2025, 8, 30, 10, 15)
+    return config
+
+
+def quiet(message):
+    pass
+
+
+def bench_idle(seconds=2.0):
+    """CPU used by a connected sender with nothing to send."""
+    ok = True
+    for backend in BACKENDS:
+        port = PtyPort()
+        sender = SerialSender(port.device, 9600, period=5, log_debug=quiet, backend=backend)
+        sender.start()
+        time.sleep(0.2)
+        cpu = time.process_time()
+        time.sleep(seconds)
+        cpu = time.process_time() - cpu
+        sender.stop()
+        port.close()
+        print(f"idle [{backend}]: {cpu * 1000:.2f} ms CPU over {seconds:.1f} s")
+        ok &= cpu < 0.02 * seconds
+    return ok
+
+
+def bench_latency(rounds=20):
+    """Time from send() until the frame is readable on the other end."""
+    ok = True
+    for backend in BACKENDS:
+        port = PtyPort()
+        sender = SerialSender(port.device, 115200, period=0, log_debug=quiet, backend=backend)
+        sender.start()
+        time.sleep(0.2)
+        delays = []
+        for _ in range(rounds):
+            t0 = time.monotonic()
+            sender.send("#12  A ")
+            if port.read_frame(1.0) is None:
+                break
+            delays.append(time.monotonic() - t0)
+            time.sleep(0.05)
+        sender.stop()
+        port.close()
+        if len(delays) < rounds:
+            print(f"latency [{backend}]: only {len(delays)}/{rounds} frames arrived")
+            ok = False
+            continue
+        delays.sort()
+        print(f"latency [{backend}]: median {delays[rounds // 2] * 1000:.2f} ms, "
+              f"max {delays[-1] * 1000:.2f} ms")
+        ok &= delays[-1] < 0.02
+    return ok
+
+
+def bench_boards(count=3, seconds=2.0, period=0.2):
+    """Several boards on their own ptys, one of them stalled.
+
+    The stalled board never drains its pty and is handed a frame far larger
+    than the pty buffer, so its write blocks. The others must keep their
+    period regardless.
+    """
+    config = sample_configuration(period)
+    expected = int(seconds / period)
+    ok = True
+    for backend in BACKENDS:
+        manager = SenderManager(log_debug=quiet, backend=backend)
+        ports = [PtyPort() for _ in range(count + 1)]
+        for port in ports:
+            manager.add(port.device, 115200, config)
+        manager.get(ports[-1].device).sender.send_flush("#" * 1_000_000)
+        for port in ports[:-1]:
+            manager.display(port.device, config)
+
+        frames = {port: 0 for port in ports[:-1]}
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            ready = select.select(list(frames), [], [], max(0, deadline - time.monotonic()))[0]
+            for port in ready:
+                frames[port] += port.read_available().count(b"\r\n")
+        counts = list(frames.values())
+        print(f"boards [{backend}]: {manager.summary()}, frames per healthy board in "
+              f"{seconds:.1f} s: {counts} (expected ~{expected})")
+        manager.remove_all()
+        time.sleep(0.1)
+        for port in ports:
+            port.close()
+        ok &= all(c >= expected - 1 for c in counts)
+    return ok
+
+
+def bench_ports(count=32, seconds=1.0, period=0.05):
+    """Threads needed and frames delivered with many ports open at once."""
+    ok = True
+    for backend in BACKENDS:
+        threads = threading.active_count()
+        ports = [PtyPort() for _ in range(count)]
+        senders = [SerialSender(p.device, 115200, period=period, log_debug=quiet, backend=backend)
+                   for p in ports]
+        for sender in senders:
+            sender.start()
+            sender.send_cycle(["#12  A ", "#O 10:00", "#C 10:15", "#RIGHT  "])
+        time.sleep(0.2)
+        extra = threading.active_count() - threads
+        time.sleep(seconds)
+        frames = sum(p.read_available().count(b"\r\n") for p in ports)
+        for sender in senders:
+            sender.stop()
+        for port in ports:
+            port.close()
+        print(f"ports [{backend}]: {count} ports, {extra} extra threads, "
+              f"{frames / count:.1f} frames per port")
+        ok &= frames >= count * seconds / period
+    return ok
+
+
+def bench_encode(rounds=100_000):
+    """Cost of building a cycle's frames: strings per click vs cached bytes."""
+    config = sample_configuration()
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        [m.encode() + b"\r\n" for m in encode_message(config)]
+    strings = (time.perf_counter() - t0) / rounds
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        encode_frames(config)
+    cached = (time.perf_counter() - t0) / rounds
+    print(f"encode: {strings * 1e6:.2f} us per cycle from strings, "
+          f"{cached * 1e6:.2f} us from cache")
+    return cached < strings
+
+
+def bench_throughput(seconds=1.0):
+    """Frames/s through the send path, one write per frame vs per cycle.
+
+    A pty does not throttle to the baud rate, so the measured rate is what
+    the sender itself can sustain; the wire limit at each baud rate (8N1,
+    10 bits per byte) is printed next to it.
+    """
+    frames = encode_frames(sample_configuration())
+    frame_len = sum(map(len, frames)) / len(frames)
+    ok = True
+    for baud in BAUD_RATES:
+        rates = {}
+        for batch in (False, True):
+            port = PtyPort()
+            sender = SerialSender(port.device, baud, period=0, log_debug=quiet)
+            sender.start()
+            sender.send_cycle([encode_block(sample_configuration())] if batch else frames)
+            count = 0
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                count += port.read_available(0.01).count(b"\r\n")
+            sender.stop()
+            port.close()
+            rates[batch] = count / seconds
+        wire = baud / 10 / frame_len
+        print(f"throughput @{baud}: {rates[False]:.0f} frames/s per-frame writes, "
+              f"{rates[True]:.0f} frames/s batched, wire limit {wire:.0f} frames/s")
+        ok &= min(rates.values()) > wire
+    return ok
+
+
+def bench_update(period=5.0, rounds=5):
+    """Time for a changed close time to reach a board on a long period."""
+    config = sample_configuration(period)
+    port = PtyPort()
+    manager = SenderManager(log_debug=quiet)
+    manager.add(port.device, 115200, config)
+    manager.display(port.device, config)
+    time.sleep(0.2)
+    port.read_available()
+    delays = []
+    for minute in range(20, 20 + rounds):
+        config.close_time = config.close_time.replace(minute=minute)
+        t0 = time.monotonic()
+        manager.display(port.device, config)
+        expected = f"#C 10:{minute}".encode()
+        while (frame := port.read_frame(period)) not in (expected, None):
+            pass
+        if frame is None:
+            break
+        delays.append(time.monotonic() - t0)
+    manager.remove_all()
+    time.sleep(0.1)
+    port.close()
+    if len(delays) < rounds:
+        print(f"update: only {len(delays)}/{rounds} changes arrived")
+        return False
+    print(f"update: changed frame on the wire after max {max(delays) * 1000:.2f} ms "
+          f"(period {period:.0f} s)")
+    return max(delays) < 0.05
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def bench_board(seconds=0.5, period=0.05, cycles=40, finishes=5):
+    """Send-path numbers per baud rate against the board simulator.
+
+    - sustained frames/s with period 0 (bounded by the simulated wire)
+    - jitter of the cyclic period, p50/p99 of |interval - period|
+    - latency from Finish (clear + blank frame) to the blank on the board
+    - process CPU per frame (sender and simulator together)
+    """
+    frames = encode_frames(sample_configuration())
+    end = encode_end()
+    ok = True
+    for baud in BAUD_RATES:
+        board = BoardSimulator(baud=baud).start()
+        sender = SerialSender(board.device, baud, period=0, log_debug=quiet)
+        sender.start()
+        time.sleep(0.1)
+
+        # Sustained rate and CPU per frame
+        cpu = time.process_time()
+        sender.send_cycle(frames)
+        time.sleep(seconds)
+        sender.clear_queue()
+        cpu = time.process_time() - cpu
+        arrivals = [t for t, _ in board.frames]
+        rate = (len(arrivals) - 1) / (arrivals[-1] - arrivals[0])
+        cpu_per_frame = cpu / len(arrivals)
+        time.sleep(0.1)
+
+        # Period jitter
+        board.reset()
+        sender.set_period(period)
+        sender.send_cycle(frames)
+        time.sleep(period * (cycles + 1))
+        arrivals = [t for t, _ in board.frames][:cycles]
+        jitter = [abs(b - a - period) for a, b in zip(arrivals, arrivals[1:])]
+
+        # Finish-to-blank latency
+        latencies = []
+        for _ in range(finishes):
+            time.sleep(period * 1.5)
+            t0 = time.monotonic()
+            sender.clear_queue()
+            sender.send_flush(end)
+            arrived = board.wait_for(end, since=t0)
+            if arrived is None:
+                break
+            latencies.append(arrived - t0)
+            sender.send_cycle(frames)
+
+        sender.stop()
+        board.stop()
+        if len(latencies) < finishes:
+            print(f"board @{baud}: blank frame lost")
+            ok = False
+            continue
+        print(f"board @{baud}: {rate:.0f} frames/s, jitter p50 {percentile(jitter, 50) * 1000:.2f} ms "
+              f"p99 {percentile(jitter, 99) * 1000:.2f} ms, finish->blank max "
+              f"{max(latencies) * 1000:.2f} ms, {cpu_per_frame * 1e6:.1f} us CPU/frame")
+        ok &= percentile(jitter, 99) < period / 2 and max(latencies) < 0.1
+    return ok
+
+
+def bench_telemetry(rounds=200_000, seconds=1.0):
+    """Cost of recording a frame and its reply, and a live link's stats."""
+    telemetry = LinkTelemetry()
+    t0 = time.perf_counter()
+    for i in range(rounds):
+        telemetry.frame_written(i, i, i, 10)
+        telemetry.reply_received(i)
+    per_frame = (time.perf_counter() - t0) / rounds
+    wire = 10 * 10 / 115200
+    print(f"telemetry: {per_frame * 1e6:.2f} us per frame "
+          f"({per_frame / wire * 100:.2f}% of a frame's wire time at 115200)")
+
+    board = BoardSimulator(baud=115200, reply=b"OK").start()
+    sender = SerialSender(board.device, 115200, period=0.01, log_debug=quiet)
+    sender.start()
+    sender.send_cycle(encode_frames(sample_configuration()))
+    time.sleep(seconds)
+    sender.stop()
+    board.stop()
+    summary = sender.telemetry.summary()
+    print(f"telemetry: live link {sender.telemetry.summary_line()}")
+    return per_frame < wire * 0.05 and summary["replies"] > 0
+
+
+def bench_reconnect(period=0.05):
+    """Time to resume after the adapter drops and comes back.
+
+    The sender opens a symlink to board A's pty. The link is repointed to a
+    new board B and A is unplugged (its pty closed); the sender must reopen
+    the same path and continue the cycle where it stopped.
+    """
+    frames = [f.decode().strip() for f in encode_frames(sample_configuration())]
+    ok = True
+    for backend in BACKENDS:
+        link = os.path.join(tempfile.mkdtemp(), "ventus-port")
+        board_a = BoardSimulator().start()
+        os.symlink(board_a.device, link)
+        sender = SerialSender(link, 115200, period=period, log_debug=quiet, backend=backend)
+        sender.start()
+        sender.send_cycle(frames)
+        time.sleep(0.5)
+
+        board_b = BoardSimulator().start()
+        os.symlink(board_b.device, link + ".new")
+        os.replace(link + ".new", link)
+        t0 = time.monotonic()
+        board_a.stop()
+        last = board_a.frames[-1][1]
+        arrived = board_b.wait_for(frames[(frames.index(last) + 1) % len(frames)], timeout=5) \
+            or board_b.wait_for(last, timeout=0)
+        sender.stop()
+        board_b.stop()
+        os.remove(link)
+        if arrived is None:
+            print(f"reconnect [{backend}]: cycle did not resume")
+            ok = False
+            continue
+        first = board_b.frames[0][1]
+        print(f"reconnect [{backend}]: resumed after {(arrived - t0) * 1000:.0f} ms, "
+              f"last frame before drop {last!r}, first after {first!r}, "
+              f"reconnects {sender.telemetry.reconnects}")
+        ok &= sender.telemetry.reconnects == 1 and first in (last, frames[(frames.index(last) + 1) % len(frames)])
+    return ok
+
+
+def bench_schedule(count=500, spacing=0.005, lead=0.5):
+    """Timing accuracy of a day schedule with many rounds and live edits.
+
+    count back-to-back rounds of spacing seconds each; every tenth round is
+    removed and every other remaining one moved before it fires.
+    """
+    fired = []
+    schedule = DaySchedule(
+        on_start=lambda config: fired.append((time.monotonic(), config.series)),
+        on_end=lambda round_: None,
+        log_debug=quiet,
+    )
+    base = datetime.now() + timedelta(seconds=lead)
+    base_mono = time.monotonic() + lead
+    expected = {}
+    ids = []
+    for i in range(count):
+        config = sample_configuration()
+        config.series = str(i)
+        start = base + timedelta(seconds=i * spacing)
+        ids.append(schedule.add(Round(config, start, start + timedelta(seconds=spacing))))
+        expected[str(i)] = base_mono + i * spacing
+    schedule.start()
+    for i in range(0, count, 10):
+        schedule.remove(ids[i])
+        del expected[str(i)]
+    for i in range(1, count, 20):
+        config = sample_configuration()
+        config.series = str(i)
+        start = base + timedelta(seconds=i * spacing + spacing / 2)
+        schedule.update(ids[i], Round(config, start, start + timedelta(seconds=spacing / 2)))
+        expected[str(i)] += spacing / 2
+    cpu = time.process_time()
+    time.sleep(lead + count * spacing + 0.2)
+    cpu = time.process_time() - cpu
+    schedule.stop()
+    late = [t - expected[series] for t, series in fired]
+    in_order = [series for _, series in fired] == sorted(expected, key=expected.get)
+    print(f"schedule: {len(fired)}/{len(expected)} rounds, lateness p50 "
+          f"{percentile(late, 50) * 1000:.2f} ms max {max(late) * 1000:.2f} ms, "
+          f"in order {in_order}, {cpu * 1000:.0f} ms CPU")
+    return len(fired) == len(expected) and in_order and max(late) < 0.05
+
+
+def bench_countdown(ticks=500, interval=0.01, period=0.05):
+    """Drift of just-in-time ticker frames while the cycle keeps running.
+
+    The countdown runs once a second; here the same ticker runs at interval
+    to gather many frames quickly. Arrival error against the ideal
+    first + k * interval is fitted with a line, and its slope is projected
+    over 3600 frames (an hour of real countdown).
+    """
+    board = BoardSimulator().start()
+    sender = SerialSender(board.device, 115200, period=period, log_debug=quiet)
+    sender.start()
+    sender.send_cycle(encode_frames(sample_configuration()))
+    first = time.monotonic() + 0.1
+    sender.start_ticker(first, interval, lambda k: f"#T {k:05}" if k < ticks else None)
+    time.sleep(0.2 + ticks * interval)
+
+    # A real countdown for a couple of seconds, aligned to wall seconds.
+    shown = {key: board.state[key] for key in ("series", "group")}
+    sender.start_countdown(datetime.now() + timedelta(seconds=90))
+    time.sleep(2.5)
+    sender.stop()
+    board.stop()
+    unchanged = {key: board.state[key] for key in shown} == shown
+
+    ticked = {int(f[3:]): t for t, f in board.frames if f.startswith("#T") and ":" not in f}
+    cyclic = sum(1 for _, f in board.frames if not f.startswith("#T"))
+    ks = sorted(ticked)
+    errors = [ticked[k] - (first + k * interval) for k in ks]
+    mean_k, mean_e = sum(ks) / len(ks), sum(errors) / len(errors)
+    slope = sum((k - mean_k) * (e - mean_e) for k, e in zip(ks, errors)) / \
+        sum((k - mean_k) ** 2 for k in ks)
+    countdown = [(t, f) for t, f in board.frames if f.startswith("#T") and ":" in f]
+    offsets = [(time.time() - (time.monotonic() - t)) % 1 for t, _ in countdown]
+    print(f"countdown: {len(ks)}/{ticks} ticks, error p50 {percentile(errors, 50) * 1000:.2f} ms "
+          f"max {max(errors) * 1000:.2f} ms, projected drift over 3600 frames "
+          f"{slope * 3600 * 1000:.3f} ms, {cyclic} cyclic frames alongside; "
+          f"real countdown {[f for _, f in countdown]} at "
+          f"+{max(offsets) * 1000:.1f} ms past the second, board shows {board.state['countdown']}, "
+          f"series/group unchanged {unchanged}")
+    return (len(ks) >= ticks * 0.95 and abs(slope * 3600) < interval
+            and cyclic >= ticks * interval / period and max(offsets) < 0.05 and unchanged)
+
+
+def bench_daemon(updates=50):
+    """Headless controller driven over its HTTP API against a pty board."""
+    no_tk = subprocess.run(
+        [sys.executable, "-c", "import daemon, sys; sys.exit('tkinter' in sys.modules)"],
+        cwd=os.path.dirname(os.path.abspath(__file__))).returncode == 0
+
+    board = BoardSimulator().start()
+    manager = SenderManager(log_debug=quiet)
+    manager.add(board.device, 115200, Configuration())
+    controller = daemon.Controller(manager)
+    server = daemon.make_server(controller, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def call(path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        with urllib.request.urlopen(urllib.request.Request(url + path, data=data)) as reply:
+            return json.loads(reply.read())
+
+    call("/configuration", {"series": "7", "group": "B", "open_time": "10:00",
+                            "close_time": "10:15", "period": "1", "a_right": False})
+    call("/display", {})
+    time.sleep(0.2)
+    t0 = time.monotonic()
+    for minute in range(updates):
+        call("/configuration", {"close_time": f"11:{minute:02}"})
+    last = f"#C 11:{updates - 1:02}"
+    arrived = board.wait_for(last, timeout=1)
+    closes = [f for _, f in board.frames if f.startswith("#C")]
+    status = call("/status")
+    call("/finish", {})
+    blank = board.wait_for("#        ", timeout=1)
+    server.shutdown()
+    controller.stop()
+    manager.remove_all()
+    time.sleep(0.1)
+    board.stop()
+    if arrived is None or blank is None:
+        print("daemon: latest state or blank frame never reached the board")
+        return False
+    print(f"daemon: {updates} updates in {(arrived - t0) * 1000:.0f} ms -> "
+          f"{len(closes) - 1} close frames on the wire ({status['applies']} applies for "
+          f"{status['requests']} requests), board shows {board.state['close']}, "
+          f"tkinter-free import {no_tk}")
+    return no_tk and board.state["blank"] and len(closes) - 1 < updates / 5
+
+
+def bench_persistence(clicks=200):
+    """Caller-side cost of saving on every Display click, and crash safety."""
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "config.json")
+    config = sample_configuration()
+
+    t0 = time.perf_counter()
+    for i in range(clicks):
+        with open(path, "w") as f:   # the old in-place save
+            json.dump(config.to_dict(), f, indent=4)
+    direct = (time.perf_counter() - t0) / clicks
+
+    store = ConfigStore(path, delay=0.1)
+    t0 = time.perf_counter()
+    for i in range(clicks):
+        config.series = f"{i % 100:02}"
+        store.save(config)
+        store.record(config)
+    queued = (time.perf_counter() - t0) / clicks
+    time.sleep(0.3)
+    saved = load_config(path).series
+
+    with open(path, "w") as f:       # a crash mid-write leaves this behind
+        f.write('{"series": "0')
+    t0 = time.perf_counter()
+    restored = load_config(path).series
+    restore = time.perf_counter() - t0
+    print(f"persistence: {direct * 1e6:.0f} us per in-place save on the caller, "
+          f"{queued * 1e6:.1f} us queued; saved {saved}, restored {restored} "
+          f"from history in {restore * 1000:.2f} ms")
+    return queued < direct and saved == restored == config.series
+
+
+def wait_for_state(board, expected, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if all(board.state.get(key) == value for key, value in expected.items()):
+            return time.monotonic()
+        time.sleep(0.001)
+    return None
+
+
+def bench_compact(period=0.25, baud=9600):
+    """Bytes and time to a complete board update, ascii vs compact frames.
+
+    The cycle alone carries the update (no burst), so ascii needs one period
+    per frame while compact fits the whole update into one. Also checks that
+    "auto" picks compact on a board that acknowledges the probe and stays on
+    ascii on one that does not.
+    """
+    config = sample_configuration(period)
+    expected = {"series": "12", "group": "A", "open": "10:00", "close": "10:15",
+                "direction": "RIGHT"}
+    ok = True
+    times = {}
+    for protocol, frames in (("ascii", encode_frames(config)),
+                             ("compact", (encode_compact(config),))):
+        board = BoardSimulator(baud=baud, compact=True).start()
+        sender = SerialSender(board.device, baud, period=period, log_debug=quiet)
+        sender.start()
+        time.sleep(0.1)
+        t0 = time.monotonic()
+        sender.send_cycle(frames)
+        done = wait_for_state(board, expected, period * (len(frames) + 2))
+        sender.stop()
+        board.stop()
+        if done is None:
+            print(f"compact: {protocol} update never completed")
+            return False
+        times[protocol] = done - t0
+        print(f"compact: {protocol} {sum(map(len, frames))} bytes/update, full update "
+              f"after {times[protocol] * 1000:.0f} ms @{baud} (period {period * 1000:.0f} ms)")
+    ok &= times["compact"] < times["ascii"]
+
+    for compact in (True, False):
+        board = BoardSimulator(baud=baud, compact=compact).start()
+        manager = SenderManager(log_debug=quiet, protocol="auto")
+        managed = manager.add(board.device, baud, config)
+        manager.display(board.device, config)
+        time.sleep(0.5)
+        settled = wait_for_state(board, expected, 2.0) is not None
+        manager.remove_all()
+        time.sleep(0.1)
+        board.stop()
+        want = "compact" if compact else "ascii"
+        print(f"compact: auto against {want} board -> {managed.protocol}"
+              f"{'' if settled else ' (board not updated)'}")
+        ok &= managed.protocol == want and settled
+    return ok
+
+
+def bench_replies(count=500, baud=115200, period=0.01):
+    """Board replies fed in random fragments at line speed, per backend.
+
+    Checks that every reply reaches a subscriber parsed and in order, the
+    delay from a reply's last byte to its callback, that the send loop keeps
+    its period while half a line sits in the buffer, and parser CPU per reply.
+    """
+    lines = [b"OK", b"ERR 2 bad frame", b"TEMP 41", b"$OK*04"]
+    types = ["ack", "error", "status", "ack"]
+    stream = [lines[i % len(lines)] + b"\r\n" for i in range(count)]
+    ok = True
+    for backend in BACKENDS:
+        port = PtyPort()
+        sender = SerialSender(port.device, baud, period=period, log_debug=quiet, backend=backend)
+        received = []
+        sender.subscribe(lambda reply: received.append((time.monotonic(), reply)))
+        sender.start()
+        time.sleep(0.1)
+        rng = random.Random(1)
+        finished = []
+        wire = time.monotonic()
+        for line in stream:
+            view = memoryview(line)
+            while view:
+                time.sleep(max(0.0, wire - time.monotonic()))
+                size = rng.randint(1, 7)
+                port.write(view[:size])
+                wire += size * 10 / baud
+                view = view[size:]
+            finished.append(time.monotonic())
+        deadline = time.monotonic() + 1.0
+        while len(received) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        delays = [at - done for (at, _), done in zip(received, finished)]
+        in_order = [reply["type"] for _, reply in received] == \
+            [types[i % len(types)] for i in range(count)]
+
+        # A partial line must not hold up the cyclic frames.
+        port.read_available(0.05)
+        sender.send_cycle([b"#12  A \r\n"])
+        port.write(b"STATUS 4")
+        t0 = time.monotonic()
+        frames = 0
+        while time.monotonic() - t0 < 0.5:
+            data = port.read_available(0.05)
+            frames += data.count(b"\r\n")
+        sender.stop()
+        port.close()
+        expected = 0.5 / period
+        print(f"replies ({backend}): {len(received)}/{count} parsed, in order {in_order}, "
+              f"delay p50 {percentile(delays, 50) * 1000:.2f} ms p99 "
+              f"{percentile(delays, 99) * 1000:.2f} ms, {frames} frames sent with a "
+              f"partial line pending (expected ~{expected:.0f})")
+        ok &= len(received) == count and in_order and frames > expected * 0.8
+
+    data = b"".join(stream) * 20
+    cuts = sorted(random.Random(2).sample(range(1, len(data)), len(data) // 4))
+    fragments = [data[a:b] for a, b in zip([0] + cuts, cuts + [len(data)])]
+    parser = ReplyParser()
+    cpu = time.process_time()
+    replies = sum(len(parser.feed(fragment)) for fragment in fragments)
+    cpu = time.process_time() - cpu
+    print(f"replies: parser {cpu / replies * 1e6:.2f} us CPU per reply "
+          f"({len(fragments)} fragments, {replies} replies)")
+    return ok and replies == count * 20
+
+
+def bench_session(seconds=1.0, period=0.02, baud=115200, speeds=(1, 10)):
+    """Recording cost, file size and replay timing of a session file.
+
+    A manager records a live session against a replying simulator; the
+    outgoing frames are then replayed into a fresh simulator at each speed
+    and the gaps between arrivals compared with the recorded ones.
+    """
+    import serial
+    rounds = 100_000
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = SessionRecorder(os.path.join(directory, "cost.ventus"))
+        frame = encode_frames(sample_configuration())[0]
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            recorder.record(OUT, frame)
+        cost = (time.perf_counter() - t0) / rounds
+        recorder.close()
+
+        board = BoardSimulator(baud=baud, reply=b"OK").start()
+        manager = SenderManager(log_debug=quiet, record=directory)
+        manager.add(board.device, baud, sample_configuration(period))
+        manager.display(board.device, sample_configuration(period))
+        time.sleep(seconds)
+        manager.finish_all()
+        time.sleep(0.1)
+        manager.remove_all()
+        time.sleep(0.2)
+        board.stop()
+        path = next(os.path.join(directory, name) for name in os.listdir(directory)
+                    if name.startswith("session-"))
+        with SessionReader(path) as session:
+            records = list(session)
+        sent = [(t, payload) for t, direction, payload in records if direction == OUT]
+        replies = sum(payload.count(b"\n") for _, direction, payload in records if direction == IN)
+        print(f"session: record {cost * 1e6:.2f} us per frame, {os.path.getsize(path)} bytes for "
+              f"{len(sent)} writes out and {replies} replies in")
+        ok = len(sent) > seconds / period * 0.8 and replies >= len(sent) - 1
+
+        # Frame-by-frame expectation: the record index of every line sent.
+        lines = [(index, line.decode()) for index, (_, payload) in enumerate(sent)
+                 for line in payload.split(b"\r\n")[:-1]]
+        for speed in speeds:
+            replayed = BoardSimulator(baud=baud).start()
+            with serial.Serial(replayed.device, baud) as port:
+                count = replay(path, port.write, speed)
+                time.sleep(0.1)
+            same = [frame for _, frame in replayed.frames] == [line for _, line in lines]
+            # Arrival of each record's first line against its scaled recorded
+            # time; the constant part (wire and pty latency) is taken out.
+            # The first two records (the Display burst and the cycle frame
+            # right behind it) are wire-bound, not timed.
+            arrived = {}
+            for (index, _), (t, _) in zip(lines, replayed.frames):
+                if index >= 2:
+                    arrived.setdefault(index, t - sent[index][0] / speed)
+            offset = percentile(list(arrived.values()), 50)
+            errors = [abs(t - offset) for t in arrived.values()]
+            print(f"session: replay x{speed} {count} records, timing error p50 "
+                  f"{percentile(errors, 50) * 1000:.2f} ms p99 {percentile(errors, 99) * 1000:.2f} ms, "
+                  f"same frames {same}, board blank at the end {replayed.state.get('blank')}")
+            replayed.stop()
+            ok &= count == len(sent) and same and percentile(errors, 99) < 0.005
+    return ok
+
+
+def bench_pacing(seconds=1.5, ceiling=5.0):
+    """Period chosen by adaptive pacing for boards of different speeds.
+
+    The operator period (5 s) is only the upper bound, and a board that never
+    replies keeps it; each case reports the settled period, how often the whole cycle refreshes, and the largest
+    backlog of unprocessed frames on the board.
+    """
+    cases = [
+        ("fast board", 115200, b"OK", None),
+        ("fast board", 9600, b"OK", None),
+        ("slow board 40 ms/frame", 115200, b"OK", 0.04),
+        ("silent board", 9600, None, None),
+    ]
+    config = sample_configuration(ceiling)
+    frames = encode_frames(config)
+    ok = True
+    for name, baud, reply, busy in cases:
+        board = BoardSimulator(baud=baud, reply=reply, busy=busy).start()
+        sender = SerialSender(board.device, baud, period=ceiling, log_debug=quiet,
+                              pacing="adaptive")
+        sender.start()
+        sender.send_cycle(frames)
+        backlog = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            backlog = max(backlog, board.backlog)
+            time.sleep(0.005)
+        period = sender.period
+        backoffs = sender.pacer.backoffs
+        count = len(board.frames)
+        sender.stop()
+        board.stop()
+        wire = max(map(len, frames)) * 10 / baud
+        print(f"pacing: {name} @{baud}: period {period * 1000:.1f} ms "
+              f"(wire {wire * 1000:.2f} ms, limit {ceiling:.0f} s), full refresh every "
+              f"{period * len(frames) * 1000:.0f} ms, {count} frames, "
+              f"board backlog max {backlog}, backoffs {backoffs}")
+        if reply is None:
+            ok &= period == ceiling     # no replies, no evidence: keep the operator's period
+        else:
+            ok &= wire <= period < ceiling
+        if busy:
+            ok &= period >= busy and backlog <= 4
+    return ok
+
+
+def _board_process(conn, seconds):
+    """Child process: act as a board on a pty and report frame arrival times.
+
+    Runs outside the benchmark process so the measurement itself is not
+    disturbed by the load put on the sender's side.
+    """
+    port = PtyPort()
+    conn.send(port.device)
+    arrivals = []
+    deadline = time.monotonic() + seconds
+    while (left := deadline - time.monotonic()) > 0:
+        if port.read_frame(left) is not None:
+            arrivals.append(time.monotonic())
+    conn.send(arrivals)
+    conn.recv()                     # keep the pty open until the sender is gone
+    port.close()
+
+
+def gui_load(stop):
+    """Stand-in for a busy Tk thread: long GIL-holding calls (like widget
+    rebuilds) mixed with short Python work."""
+    data = list(range(200_000))
+    random.Random(3).shuffle(data)
+    while not stop.is_set():
+        sorted(data)
+        "".join(str(i) for i in range(2000))
+
+
+def bench_process(seconds=3.0, period=0.02):
+    """Cyclic send jitter with a loaded GUI thread: sender in-process vs in
+    a child process (backend="process")."""
+    import multiprocessing
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for backend in ["thread", "process"]:
+        conn, child_conn = context.Pipe()
+        board = context.Process(target=_board_process, args=(child_conn, seconds + 1.0))
+        board.start()
+        device = conn.recv()
+        manager = SenderManager(log_debug=quiet)
+        config = sample_configuration(period)
+        manager.add(device, 115200, config, backend=backend)
+        manager.display(device, config)
+        time.sleep(1.0)             # let a child sender start up
+        stop = threading.Event()
+        load = threading.Thread(target=gui_load, args=(stop,))
+        start = time.monotonic()
+        load.start()
+        arrivals = [t for t in conn.recv() if t >= start]
+        stop.set()
+        load.join()
+        manager.get(device).sender.stop()
+        conn.send("done")
+        board.join()
+        jitter = [abs(b - a - period) for a, b in zip(arrivals, arrivals[1:])]
+        results[backend] = percentile(jitter, 99)
+        print(f"process [{backend}] under GUI load: {len(arrivals)} frames "
+              f"(expected ~{seconds / period:.0f}), jitter p50 {percentile(jitter, 50) * 1000:.2f} ms "
+              f"p99 {percentile(jitter, 99) * 1000:.2f} ms max {max(jitter) * 1000:.2f} ms")
+    return results["process"] < results["thread"] and results["process"] < period / 2
+
+
+def bench_watchdog(period=0.1):
+    """How fast the watchdog reports a board that stops answering.
+
+    - a replying board goes silent mid-cycle (per backend), then answers again
+    - the same on a 5 s period, found by the heartbeat
+    - a board that stops reading, so writes stall
+    - a board that never replies must not raise false alarms
+    """
+    def watch(board, baud, period, **options):
+        events = []
+        sender = SerialSender(board.device, baud, period=period, log_debug=quiet,
+                              on_failure=lambda status="failed": events.append((time.monotonic(), status)),
+                              on_reconnect=lambda: events.append((time.monotonic(), "ok")),
+                              **options)
+        sender.start()
+        sender.send_cycle(encode_frames(sample_configuration()))
+        return sender, events
+
+    def first(events, status, since):
+        return next((t - since for t, s in events if s == status and t >= since), None)
+
+    ok = True
+    cases = [(backend, period, {}) for backend in BACKENDS] + \
+        [("thread", 5.0, {"watchdog": {"heartbeat": 0.25}})]
+    for backend, case_period, options in cases:
+        board = BoardSimulator(baud=115200, reply=b"OK").start()
+        sender, events = watch(board, 115200, case_period, backend=backend, **options)
+        time.sleep(1.0)
+        t0 = time.monotonic()
+        board.reply = None
+        time.sleep(2.5)
+        t1 = time.monotonic()
+        board.reply = b"OK"
+        time.sleep(1.0)
+        sender.stop()
+        board.stop()
+        degraded, dead, back = first(events, "degraded", t0), first(events, "dead", t0), first(events, "ok", t1)
+        name = f"{backend}, period {case_period:g} s" + (", heartbeat" if options else "")
+        if None in (degraded, dead, back):
+            print(f"watchdog [{name}]: missed a transition: {events}")
+            ok = False
+            continue
+        print(f"watchdog [{name}]: board silent -> degraded after {degraded * 1000:.0f} ms, "
+              f"dead after {dead * 1000:.0f} ms, answering again -> ok after {back * 1000:.0f} ms")
+        ok &= degraded < 1.0 and back < 1.0
+
+    # A board that stops reading: writes block once the pty buffer is full.
+    port = PtyPort()
+    sender, events = watch(port, 9600, 0)
+    time.sleep(2.5)
+    stalled = list(sender.watchdog.detections)
+    port.close()                # unblocks the stuck write
+    sender.stop()
+    if stalled and stalled[0][0] == "dead":
+        print(f"watchdog: stalled write reported after {stalled[0][1] * 1000:.0f} ms "
+              f"(write_timeout {sender.watchdog.write_timeout * 1000:.0f} ms)")
+        ok &= stalled[0][1] < sender.watchdog.write_timeout + 0.2
+    else:
+        print(f"watchdog: stalled write not reported: {events}")
+        ok = False
+
+    board = BoardSimulator(baud=115200).start()
+    sender, events = watch(board, 115200, period)
+    time.sleep(1.5)
+    sender.stop()
+    board.stop()
+    print(f"watchdog: board without replies, {len(events)} false alarms")
+    return ok and not events
+
+
+# Runs the GUI without its __main__ block and prints monotonic times of the
+# first draw (<Map>) and of the end of the deferred load; exits 2 without a display.
+GUI_PROBE = """
+import sys, time
+import main
+
+App = main.MainApplication
+first_map, load = App._on_first_map, App._load
+
+def on_first_map(self, event):
+    drawn.append(time.monotonic())
+    first_map(self, event)
+
+def loaded(self):
+    load(self)
+    self.update_idletasks()
+    print(drawn[0], time.monotonic(), flush=True)
+    self.after(0, self.on_close)
+
+drawn = []
+App._on_first_map, App._load = on_first_map, loaded
+try:
+    app = App()
+except Exception:
+    sys.exit(2)
+app.mainloop()
+"""
+
+
+def bench_startup(runs=5):
+    """Cold start: import cost of the GUI module, and time from launching the
+    GUI to its first draw and to its fully loaded window."""
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    def median_run(code):
+        times = []
+        for _ in range(runs):
+            t0 = time.monotonic()
+            subprocess.run([sys.executable, "-c", code], cwd=here, check=True)
+            times.append(time.monotonic() - t0)
+        return sorted(times)[runs // 2]
+
+    baseline = median_run("pass")
+    imports = {name: median_run(f"import {name}") - baseline for name in ("serial_sender", "main")}
+    heavy = subprocess.run(
+        [sys.executable, "-c", "import sys, main; print(' '.join(sorted(m for m in "
+         "('asyncio', 'multiprocessing', 'serial', 'argparse') if m in sys.modules)))"],
+        cwd=here, capture_output=True, text=True, check=True).stdout.split()
+    print(f"startup: import serial_sender {imports['serial_sender'] * 1000:.0f} ms, "
+          f"main {imports['main'] * 1000:.0f} ms over a bare interpreter "
+          f"({baseline * 1000:.0f} ms); heavy modules loaded by main: {heavy or 'none'}")
+    ok = not heavy and imports["main"] < 0.15
+
+    draws, loads = [], []
+    for _ in range(runs):
+        t0 = time.monotonic()
+        probe = subprocess.run([sys.executable, "-c", GUI_PROBE], cwd=here,
+                               capture_output=True, text=True, timeout=30)
+        if probe.returncode == 2:
+            print("startup: no display, time to first draw not measured")
+            return ok
+        drawn, loaded = map(float, probe.stdout.split()[:2])
+        draws.append(drawn - t0)
+        loads.append(loaded - t0)
+    draw, load = sorted(draws)[runs // 2], sorted(loads)[runs // 2]
+    print(f"startup: window drawn {draw * 1000:.0f} ms after launch, "
+          f"loaded {load * 1000:.0f} ms after launch (median of {runs})")
+    return ok and draw < 0.5
+
+BENCHMARKS = {
+    "idle": bench_idle,
+    "latency": bench_latency,
+    "boards": bench_boards,
+    "ports": bench_ports,
+    "encode": bench_encode,
+    "throughput": bench_throughput,
+    "update": bench_update,
+    "board": bench_board,
+    "telemetry": bench_telemetry,
+    "reconnect": bench_reconnect,
+    "schedule": bench_schedule,
+    "countdown": bench_countdown,
+    "daemon": bench_daemon,
+    "persistence": bench_persistence,
+    "compact": bench_compact,
+    "replies": bench_replies,
+    "session": bench_session,
+    "pacing": bench_pacing,
+    "process": bench_process,
+    "watchdog": bench_watchdog,
+    "startup": bench_startup,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    results = [BENCHMARKS[name]() for name in names]
+    sys.exit(0 if all(results) else 1)
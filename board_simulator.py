@@ -0,0 +1,173 @@
+import os
+import select
+import termios
+import threading
+import time
+from collections import deque
+
+from custom_coder import COMPACT_ACK, decode_compact
+from pty_port import PtyPort
+
+
+class BoardSimulator:
+    """Software stand-in for a display board, listening on a pty (POSIX only).
+
+    Point SerialSender at ``device``. Every ``#......`` frame is parsed into
+    ``state`` and recorded with its arrival time (monotonic) in ``frames``.
+    With ``baud`` set, the board only reads as fast as an 8N1 line at that
+    rate would deliver bytes, so a sender that outruns the wire is held back
+    by the pty buffer filling up, as it would be by a real UART. With ``reply`` set,
+    the board answers every frame with that line. With ``compact`` set it
+    also understands compact ``$...*XX`` frames and acknowledges the probe.
+    With ``busy`` set, the board needs that many seconds per frame: frames
+    queue up and each reply goes out only once its frame is processed.
+    """
+
+    def __init__(self, baud=None, reply=None, compact=False, busy=None):
+        self.compact = compact
+        self.busy = busy
+        self.backlog = 0            # frames received but not yet processed
+        self._done_at = 0.0
+        self._answers = deque()
+        self.port = PtyPort()
+        self.baud = baud
+        self.reply = reply
+        self.frames: list[tuple[float, str]] = []
+        self.state = {"series": None, "group": None, "open": None,
+                      "close": None, "direction": None, "countdown": None, "blank": True}
+        self.cond = threading.Condition()
+        self.running = False
+        self.thread = None
+        self._wire_free = 0.0
+        self._buffer = b""
+        self._generation = 0
+
+    @property
+    def device(self):
+        return self.port.device
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        if self.busy:
+            threading.Thread(target=self._answer, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1)
+        self.port.close()
+
+    def clear(self):
+        with self.cond:
+            self.frames.clear()
+
+    def reset(self):
+        """Discard bytes still in flight and every recorded frame."""
+        with self.cond:
+            termios.tcflush(self.port.master, termios.TCIFLUSH)
+            self._buffer = b""
+            self._generation += 1
+            self._wire_free = 0.0
+            self.frames.clear()
+
+    def wait_for(self, frame, timeout=1.0, since=0.0):
+        """Return the arrival time of frame (received after since), or None."""
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while True:
+                for arrived, received in self.frames:
+                    if received == frame and arrived >= since:
+                        return arrived
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return None
+                self.cond.wait(left)
+
+    def _run(self):
+        # Read at most 10 ms worth of line time at once when throttled.
+        chunk = max(1, self.baud // 1000) if self.baud else 65536
+        while self.running:
+            if not select.select([self.port.master], [], [], 0.1)[0]:
+                continue
+            with self.cond:
+                try:
+                    data = os.read(self.port.master, chunk)
+                except OSError:
+                    break
+                generation = self._generation
+            now = time.monotonic()
+            if self.baud:
+                # Each byte costs 10 bits on the wire: wait until the chunk
+                # has been clocked in before handing it on.
+                self._wire_free = max(now, self._wire_free) + len(data) * 10 / self.baud
+                time.sleep(max(0.0, self._wire_free - now))
+                now = self._wire_free
+            with self.cond:
+                if generation != self._generation:
+                    continue  # read before a reset()
+                self._buffer += data
+                *lines, self._buffer = self._buffer.split(b"\r\n")
+            for line in lines:
+                self._receive(line.decode(errors="replace"), now)
+
+    def _receive(self, frame, now):
+        if frame.startswith("#"):
+            self._apply(frame)
+        elif self.compact and (decoded := decode_compact(frame)):
+            if decoded["type"] == "probe":
+                self.port.write(COMPACT_ACK)
+            elif decoded["type"] == "update":
+                self.state.update({key: decoded[key] for key in
+                                   ("series", "group", "open", "close", "direction")})
+                self.state["blank"] = False
+        with self.cond:
+            self.frames.append((now, frame))
+            self.cond.notify_all()
+        if self.busy:
+            with self.cond:
+                self._done_at = max(now, self._done_at) + self.busy
+                self.backlog += 1
+                self._answers.append(self._done_at)
+                self.cond.notify_all()
+        elif self.reply:
+            self.port.write(self.reply + b"\r\n")
+
+    def _answer(self):
+        """Finish queued frames one by one, replying as each is done."""
+        while self.running:
+            with self.cond:
+                if not self._answers:
+                    self.cond.wait(0.1)
+                    continue
+                due = self._answers[0]
+            time.sleep(max(0.0, due - time.monotonic()))
+            with self.cond:
+                self._answers.popleft()
+                self.backlog -= 1
+            if self.reply:
+                try:
+                    self.port.write(self.reply + b"\r\n")
+                except OSError:
+                    break
+
+    def _apply(self, frame):
+        body = frame[1:]
+        state = self.state
+        if not body.strip():
+            state["blank"] = True
+            return
+        state["blank"] = False
+        if body.startswith("O "):
+            state["open"] = body[2:].strip()
+        elif body.startswith("C "):
+            state["close"] = body[2:].strip()
+        elif body.startswith("T "):
+            state["countdown"] = body[2:].strip()
+        elif body.strip() in ("RIGHT", "LEFT"):
+            state["direction"] = body.strip()
+        else:
+            state["series"] = body[:2]
+            state["group"] = body[2:].strip() or None
@@ -0,0 +1,154 @@
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from configuration import Configuration
+
+
+def get_config_path():
+    if getattr(sys, 'frozen', False):
+        base_dir = os.path.join(os.getenv("APPDATA"), "Ventus-App")
+    else:
+        base_dir = os.path.dirname(__file__)
+    os.makedirs(base_dir, exist_ok=True)
+    return os.path.join(base_dir, "config.json")
+
+
+def get_history_path(config_path=None):
+    return os.path.join(os.path.dirname(config_path or get_config_path()), "history.jsonl")
+
+
+def write_atomic(path, text):
+    """Replace path with text so readers see the old or new file, never half."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def last_lines(path, block=4096):
+    """Yield the non-empty lines of a file, last first, reading from the end."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            data = b""
+            while end > 0:
+                start = max(0, end - block)
+                f.seek(start)
+                data = f.read(end - start) + data
+                end = start
+                lines = data.split(b"\n")
+                # The first piece may be cut by the block boundary; keep it for the next read.
+                data = lines.pop(0) if end > 0 else b""
+                for line in reversed(lines):
+                    if line.strip():
+                        yield line.decode(errors="replace")
+            if data.strip():
+                yield data.decode(errors="replace")
+    except OSError:
+        return
+
+
+def load_config(path=None) -> Configuration:
+    """Load config.json; if it is missing or damaged, use the last displayed one."""
+    path = path or get_config_path()
+    if os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                return Configuration.from_dict(json.load(f))
+        except Exception as e:
+            logging.error(f"Failed to load config: {e}")
+    # A crash while appending can leave the last line torn; fall back to the one before.
+    for line in last_lines(get_history_path(path)):
+        try:
+            return Configuration.from_dict(json.loads(line))
+        except Exception as e:
+            logging.error(f"Skipping unreadable config history entry: {e}")
+    return Configuration()
+
+
+class ConfigStore:
+    """Persists the configuration from a background thread.
+
+    save() is debounced: the file is written once, ``delay`` seconds after
+    the last call, atomically (temp file, fsync, rename). record() appends
+    the configuration to an append-only JSON-lines history of everything
+    displayed this session. Both take a snapshot on the calling thread and
+    return at once; flush() writes whatever is pending before exit, after
+    any write already in progress.
+    """
+
+    def __init__(self, path=None, delay=0.5):
+        self.path = path or get_config_path()
+        self.history_path = get_history_path(self.path)
+        self.delay = delay
+        self.cond = threading.Condition()
+        self.pending = None
+        self.due = 0.0
+        self.history = []
+        self.write_lock = threading.Lock()  # one writer at a time, snapshots in order
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def save(self, config: Configuration) -> None:
+        with self.cond:
+            self.pending = config.to_dict()
+            self.due = time.monotonic() + self.delay
+            self.cond.notify()
+
+    def record(self, config: Configuration) -> None:
+        entry = {"displayed": datetime.now().isoformat(timespec="seconds"), **config.to_dict()}
+        with self.cond:
+            self.history.append(json.dumps(entry, separators=(",", ":")))
+            self.cond.notify()
+
+    def flush(self) -> None:
+        with self.write_lock:
+            with self.cond:
+                pending, self.pending = self.pending, None
+                history, self.history = self.history, []
+            self._write(pending, history)
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while True:
+                    wait = self.due - time.monotonic() if self.pending else None
+                    if self.history or (self.pending and wait <= 0):
+                        break
+                    self.cond.wait(wait)
+            # Take the snapshot under the write lock, so a flush() cannot
+            # write a newer one that this older one then overwrites.
+            with self.write_lock:
+                with self.cond:
+                    # A debounced save that is not due yet stays pending.
+                    pending = None
+                    if self.pending and self.due <= time.monotonic():
+                        pending, self.pending = self.pending, None
+                    history, self.history = self.history, []
+                self._write(pending, history)
+
+    def _write(self, pending, history):
+        if history:
+            try:
+                with open(self.history_path, "a") as f:
+                    f.write("\n".join(history) + "\n")
+            except Exception as e:
+                logging.error(f"Failed to record config history: {e}")
+        if pending is not None:
+            try:
+                write_atomic(self.path, json.dumps(pending, indent=4))
+            except Exception as e:
+                logging.error(f"Failed to save config: {e}")
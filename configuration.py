@@ -1,5 +1,8 @@
 from datetime import datetime
 
+PERIODS = ["3", "5", "10", "20", "30"]                # seconds per frame the operator can pick
+BAUD_RATES = [9600, 19200, 38400, 57600, 115200]    # serial speeds the boards support
+
 class Configuration:
     """A simple configuration class to hold settings."""
 
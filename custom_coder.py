@@ -10,9 +10,18 @@
 
 
 hash + 6 znakov + /r + /n
+
+Compact mode (optional, per board): everything in one checksummed frame
+
+    $ssgOOOOCCCCd*XX
+
+ss series, g group, OOOO/CCCC open and close as hhmm ("----" if unset),
+d direction R/L ("-" if unset), XX the XOR of the payload bytes in hex.
+"$?*3F" asks a board whether it speaks compact mode; it answers "$OK*..".
 """
 from configuration import Configuration
 from datetime import time
+from functools import lru_cache
 
 def encode_clock(datetime: time) -> str:
     """Encode a datetime object into a time string."""
@@ -22,31 +31,149 @@ def encode_clock(datetime: time) -> str:
     open_minute_str = f"{open_minute:02}"
     return f"{open_hour_str}:{open_minute_str}"
 
-def encode_message(config: Configuration) -> list[str]:
-    """Encode the configuration into a list of messages to send."""
+def _config_key(config: Configuration) -> tuple:
+    """The configuration content that ends up on the board."""
+    return (
+        config.series,
+        config.group,
+        encode_clock(config.open_time) if config.open_time else None,
+        encode_clock(config.close_time) if config.close_time else None,
+        config.a_right,
+    )
+
+def _messages(series, group, open_time, close_time, a_right) -> list[str]:
     messages = []
-    
+
     # Series and Group
-    series = config.series.zfill(2) if config.series else "00"
-    group = config.group if config.group else " "
-    messages.append(f"#{series}  {group} ")
-    
+    series = series.zfill(2) if series else "00"
+    group_char = group if group else " "
+    messages.append(f"#{series}  {group_char} ")
+
     # Open Time
-    if config.open_time:
-        messages.append(f"#O {encode_clock(config.open_time)}")
-    
+    if open_time:
+        messages.append(f"#O {open_time}")
+
     # Close Time
-    if config.close_time:
-        messages.append(f"#C {encode_clock(config.close_time)}")
-
-    if config.a_right is not None:
-        if config.a_right and config.group in ['A', 'C'] or \
-        not config.a_right and config.group in ['B', 'D']:
-            messages.append(f"#RIGHT  ")
-        else:
-            messages.append(f"#LEFT   ")
-    
+    if close_time:
+        messages.append(f"#C {close_time}")
+
+    direction = _direction(group, a_right)
+    if direction == "RIGHT":
+        messages.append(f"#RIGHT  ")
+    elif direction == "LEFT":
+        messages.append(f"#LEFT   ")
+
     return messages
 
+def _direction(group, a_right) -> str | None:
+    if a_right is None:
+        return None
+    if a_right and group in ['A', 'C'] or \
+    not a_right and group in ['B', 'D']:
+        return "RIGHT"
+    return "LEFT"
+
+def encode_message(config: Configuration) -> list[str]:
+    """Encode the configuration into a list of messages to send."""
+    return _messages(*_config_key(config))
+
+@lru_cache(maxsize=32)
+def _compile(key: tuple) -> tuple[bytes, ...]:
+    return tuple(message.encode() + b"\r\n" for message in _messages(*key))
+
+def encode_frames(config: Configuration) -> tuple[bytes, ...]:
+    """Ready-to-send frames (CRLF included), cached by configuration content."""
+    return _compile(_config_key(config))
+
+@lru_cache(maxsize=32)
+def _compile_block(key: tuple) -> bytes:
+    return b"".join(_compile(key))
+
+def encode_block(config: Configuration) -> bytes:
+    """All frames of one display cycle as a single block, for one write; cached like encode_frames."""
+    return _compile_block(_config_key(config))
+
 def encode_end() -> str:
-    return "#        "
\ No newline at end of file
+    return "#        "
+
+def _checksum(payload: str) -> str:
+    value = 0
+    for byte in payload.encode():
+        value ^= byte
+    return f"{value:02X}"
+
+def _framed(payload: str) -> bytes:
+    return f"${payload}*{_checksum(payload)}\r\n".encode()
+
+COMPACT_PROBE = _framed("?")
+COMPACT_ACK = _framed("OK")
+
+@lru_cache(maxsize=32)
+def _compile_compact(key: tuple) -> bytes:
+    series, group, open_time, close_time, a_right = key
+    direction = _direction(group, a_right)
+    return _framed(
+        (series.zfill(2) if series else "00")
+        + (group or " ")
+        + (open_time.replace(":", "") if open_time else "----")
+        + (close_time.replace(":", "") if close_time else "----")
+        + (direction[0] if direction else "-")
+    )
+
+def encode_compact(config: Configuration) -> bytes:
+    """The whole configuration as one compact frame (CRLF included)."""
+    return _compile_compact(_config_key(config))
+
+def decode_compact(frame) -> dict | None:
+    """Parse a compact frame; None if it is not one or the checksum fails."""
+    if isinstance(frame, bytes):
+        frame = frame.decode(errors="replace")
+    frame = frame.strip()
+    if not frame.startswith("$") or frame[-3:-2] != "*":
+        return None
+    payload, checksum = frame[1:-3], frame[-2:]
+    if _checksum(payload) != checksum.upper():
+        return None
+    if payload in ("?", "OK"):
+        return {"type": "probe" if payload == "?" else "ack"}
+    if len(payload) != 12:
+        return None
+
+    def clock(text):
+        return None if text == "----" else f"{text[:2]}:{text[2:]}"
+
+    return {
+        "type": "update",
+        "series": payload[0:2],
+        "group": payload[2].strip() or None,
+        "open": clock(payload[3:7]),
+        "close": clock(payload[7:11]),
+        "direction": {"R": "RIGHT", "L": "LEFT"}.get(payload[11]),
+    }
+
+def decode_reply(line: str) -> dict | None:
+    """Classify a reply line from a board; None for an empty line.
+
+    Compact frames decode as in decode_compact, "OK"/"ACK" is an ack, lines
+    starting with "ERR" are errors and anything else is board status text.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("$"):
+        reply = decode_compact(line) or {"type": "error", "detail": "bad checksum"}
+        reply["framing"] = "compact"
+    elif line.upper() in ("OK", "ACK"):
+        reply = {"type": "ack", "framing": "ascii"}
+    elif line.upper().startswith("ERR"):
+        reply = {"type": "error", "framing": "ascii",
+                 "detail": line.partition(" ")[2] or line}
+    else:
+        reply = {"type": "status", "framing": "ascii"}
+    reply["line"] = line
+    return reply
+
+def encode_countdown(seconds: int) -> str:
+    """Encode remaining seconds as "#T mm:ss" (capped at 99:59)."""
+    seconds = max(0, min(int(seconds), 99 * 60 + 59))
+    return f"#T {seconds // 60:02}:{seconds % 60:02}"
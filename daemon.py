@@ -0,0 +1,298 @@
+"""
+Headless controller: drives the boards without the Tk GUI (tkinter is never
+imported) and takes commands over a JSON HTTP API on localhost.
+
+    python daemon.py --port COM3 --port COM4 --baud 9600 --listen 127.0.0.1:8765
+    python daemon.py --port COM3 --protocol compact --port COM4 --protocol auto
+
+    GET  /status          boards, configuration and link telemetry
+    POST /configuration   {"series": "06", "group": "A", "open_time": "11:35",
+                           "close_time": "11:50", "period": "5", "a_right": true}
+    POST /display         {"countdown": false}
+    POST /finish          {}
+
+Every POST may carry "port" to address one board instead of all of them;
+an unknown port is a 404. Each board keeps its own configuration: a
+/configuration without "port" updates every board (and the default for
+boards connected later), one with "port" only that board.
+
+The API has no authentication, so it only listens on loopback unless
+--allow-remote is given.
+Updates are coalesced: a burst of requests only puts the latest state on
+the serial links.
+"""
+import argparse
+import copy
+import ipaddress
+import json
+import logging
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from configuration import Configuration
+from sender_manager import PROTOCOLS, SenderManager
+
+FIELDS = ["series", "group", "open_time", "close_time", "period", "a_right"]
+
+
+def _parse_time(value):
+    """Accept "HH:MM" (today) or an ISO datetime."""
+    if value is None or isinstance(value, datetime):
+        return value
+    if len(value) <= 5:
+        hour, minute = (int(p) for p in value.split(":"))
+        return datetime.now().replace(hour=hour, minute=minute, second=0, microsecond=0)
+    return datetime.fromisoformat(value)
+
+
+def _is_loopback(host) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class Controller:
+    """Desired board state, applied to the links by a single thread.
+
+    API calls only record what each board should show and wake the applier.
+    ``configuration`` is the default; ``configurations`` holds each port's own.
+    The applier waits ``coalesce`` seconds for more calls, then applies the
+    latest state per board, so intermediate states never reach the wire.
+    """
+
+    def __init__(self, manager: SenderManager, configuration=None, coalesce=0.05):
+        self.manager = manager
+        self.configuration = configuration or Configuration()
+        self.configurations = {}    # port -> its configuration, once it differs
+        self.coalesce = coalesce
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.desired = {}   # port -> (configuration, countdown) or None (blank)
+        self.applied = {}
+        self.requests = 0
+        self.applies = 0
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+        self.thread.join(timeout=1)
+
+    def _ports(self, port):
+        return [port] if port else list(self.manager.boards)
+
+    def configuration_for(self, port) -> Configuration:
+        return self.configurations.get(port, self.configuration)
+
+    def set_configuration(self, data: dict, port=None) -> dict:
+        """Update fields of one board, or of all of them and the default;
+        boards already displaying pick up the change."""
+        fields = {}
+        for field in FIELDS:
+            if field in data:
+                value = data[field]
+                if field in ("open_time", "close_time"):
+                    value = _parse_time(value)
+                elif field in ("series", "period") and value is not None:
+                    value = str(value)
+                fields[field] = value
+
+        def updated(config):
+            config = copy.copy(config)
+            for field, value in fields.items():
+                setattr(config, field, value)
+            return config
+
+        with self.lock:
+            if port is None:
+                self.configuration = result = updated(self.configuration)
+            for p in self._ports(port):
+                self.configurations[p] = config = updated(self.configuration_for(p))
+                if self.desired.get(p):
+                    self.desired[p] = (config, self.desired[p][1])
+            if port is not None:
+                result = self.configurations[port]
+            self._request()
+        return result.to_dict()
+
+    def display(self, port=None, countdown=False) -> bool:
+        """Show each addressed board its configuration; False (and nothing
+        changes) if any of them is incomplete."""
+        with self.lock:
+            ports = self._ports(port)
+            if not all(self.configuration_for(p).check_configuration() for p in ports):
+                return False
+            for p in ports:
+                self.desired[p] = (self.configuration_for(p), countdown)
+            self._request()
+        return True
+
+    def finish(self, port=None) -> None:
+        with self.lock:
+            for p in self._ports(port):
+                self.desired[p] = None
+            self._request()
+
+    def status(self) -> dict:
+        boards = {}
+        for port, board in list(self.manager.boards.items()):
+            boards[port] = {
+                "status": board.status,
+                "displaying": board.displaying,
+                "configuration": self.configuration_for(port).to_dict(),
+                "telemetry": board.sender.telemetry.summary(),
+            }
+        return {
+            "summary": self.manager.summary(),
+            "configuration": self.configuration.to_dict(),
+            "boards": boards,
+            "requests": self.requests,
+            "applies": self.applies,
+        }
+
+    def _request(self):
+        """Call with self.lock held."""
+        self.requests += 1
+        self.wakeup.set()
+
+    def _run(self):
+        while self.running:
+            self.wakeup.wait()
+            time.sleep(self.coalesce)
+            self.wakeup.clear()
+            self._apply()
+
+    def _apply(self):
+        """Put the latest desired state of every changed board on its link."""
+        with self.lock:
+            changes = {p: s for p, s in self.desired.items() if self.applied.get(p, None) is not s}
+            self.applied.update(changes)
+        for port, state in changes.items():
+            self.applies += 1
+            if state is None:
+                self.manager.finish(port)
+            else:
+                self.manager.display(port, state[0], countdown=state[1])
+
+
+class _Handler(BaseHTTPRequestHandler):
+    controller: Controller = None
+
+    def _reply(self, code, body):
+        data = json.dumps(body, default=str).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/status":
+            self._reply(200, self.controller.status())
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            data = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(data, dict):
+                self._reply(400, {"error": "body must be a JSON object"})
+                return
+            port = data.pop("port", None)
+            if port is not None and port not in self.controller.manager.boards:
+                self._reply(404, {"error": f"unknown port {port}"})
+                return
+            if self.path == "/configuration":
+                self._reply(200, self.controller.set_configuration(data, port))
+            elif self.path == "/display":
+                if self.controller.display(port, bool(data.get("countdown"))):
+                    self._reply(200, {"ok": True})
+                else:
+                    self._reply(409, {"error": "configuration is incomplete or invalid"})
+            elif self.path == "/finish":
+                self.controller.finish(port)
+                self._reply(200, {"ok": True})
+            else:
+                self._reply(404, {"error": "not found"})
+        except (ValueError, TypeError) as e:
+            self._reply(400, {"error": str(e)})
+
+    def log_message(self, format, *args):
+        logging.debug("API: " + format % args)
+
+
+def make_server(controller: Controller, host="127.0.0.1", port=8765) -> ThreadingHTTPServer:
+    """HTTP control server bound to localhost; port 0 picks a free one."""
+    handler = type("Handler", (_Handler,), {"controller": controller})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Display Controller")
+    parser.add_argument("--port", action="append", required=True, help="serial port (repeatable)")
+    parser.add_argument("--baud", type=int, default=9600)
+    parser.add_argument("--listen", default="127.0.0.1:8765", help="host:port of the control API")
+    parser.add_argument("--backend", choices=["thread", "asyncio", "process"], default="thread")
+    parser.add_argument("--config", help="JSON configuration to start from")
+    parser.add_argument("--record", metavar="DIR", help="record each port's traffic to DIR")
+    parser.add_argument("--pacing", choices=["fixed", "adaptive"], default="fixed",
+                        help="adaptive: run as fast as each board keeps up, period as the limit")
+    parser.add_argument("--protocol", action="append", choices=PROTOCOLS,
+                        help="frame format per --port, in the same order (repeatable; "
+                             "one value applies to all ports; default ascii)")
+    parser.add_argument("--batch", action="store_true",
+                        help="send each board's whole cycle as one write per period")
+    parser.add_argument("--allow-remote", action="store_true",
+                        help="let --listen bind a non-loopback address (the API has no authentication)")
+    args = parser.parse_args()
+    host, _, listen_port = args.listen.rpartition(":")
+    if not _is_loopback(host) and not args.allow_remote:
+        parser.error(f"refusing to expose the unauthenticated control API on {host or 'all interfaces'}; "
+                     "use a loopback address or pass --allow-remote")
+    protocols = args.protocol or ["ascii"]
+    if len(protocols) == 1:
+        protocols = protocols * len(args.port)
+    if len(protocols) != len(args.port):
+        parser.error("give one --protocol, or one per --port")
+    logging.basicConfig(level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    configuration = Configuration()
+    if args.config:
+        with open(args.config) as f:
+            configuration = Configuration.from_dict(json.load(f))
+
+    manager = SenderManager(log_debug=logging.info, backend=args.backend, batch=args.batch,
+                            record=args.record, pacing=args.pacing)
+    for port, protocol in zip(args.port, protocols):
+        manager.add(port, args.baud, configuration, protocol=protocol)
+    controller = Controller(manager, configuration)
+    server = make_server(controller, host, int(listen_port))
+    if not _is_loopback(host):
+        logging.warning(f"Control API is reachable from the network on {host or 'all interfaces'} "
+                        "without authentication")
+    logging.info(f"Control API on http://{host}:{listen_port}")
+    signal.signal(signal.SIGTERM, lambda sig, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.server_close()
+        controller.stop()
+        manager.finish_all()
+        for board in list(manager.boards.values()):
+            board.sender.stop(drain=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+A competition day as a list of rounds, each shown on a board from its start
+until its end time, when the board is blanked.
+
+Schedule files are CSV with a header row:
+
+    series,group,open,close,a_right[,start,end,period]
+    06,A,11:35,11:50,true
+    06,B,11:50,12:05,true,11:45
+
+Times are HH:MM or HH:MM:SS on the given day. start defaults to open and end
+to close.
+"""
+import csv
+import heapq
+import itertools
+import logging
+import threading
+import time
+from datetime import datetime
+
+from configuration import Configuration
+
+START = 1
+END = 0   # at the same instant, end the old round before starting the next
+
+
+class Round:
+    """One scheduled round: the configuration to show and when."""
+
+    def __init__(self, configuration: Configuration, start: datetime, end: datetime):
+        self.configuration = configuration
+        self.start = start
+        self.end = end
+        self.version = 0
+
+    def __repr__(self):
+        c = self.configuration
+        return f"Round({c.series}{c.group} {self.start:%H:%M:%S}-{self.end:%H:%M:%S})"
+
+
+def _parse_time(day: datetime, text: str) -> datetime:
+    parts = [int(p) for p in text.strip().split(":")]
+    hour, minute, second = (parts + [0])[:3]
+    return day.replace(hour=hour, minute=minute, second=second, microsecond=0)
+
+
+def load_rounds(path, day: datetime | None = None, period="5") -> list[Round]:
+    """Read rounds from a CSV schedule file for day (default today)."""
+    day = day or datetime.now()
+    rounds = []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            config = Configuration()
+            config.series = row["series"].strip().zfill(2)
+            config.group = row["group"].strip().upper()
+            config.open_time = _parse_time(day, row["open"])
+            config.close_time = _parse_time(day, row["close"])
+            config.a_right = row["a_right"].strip().lower() in ("1", "true", "yes", "y")
+            config.period = (row.get("period") or period).strip()
+            start = _parse_time(day, row["start"]) if row.get("start") else config.open_time
+            end = _parse_time(day, row["end"]) if row.get("end") else config.close_time
+            rounds.append(Round(config, start, end))
+    return rounds
+
+
+class DaySchedule:
+    """Fires on_start(configuration) and on_end(round) at each round's times.
+
+    Rounds may overlap (the next one starting before the last one ends); the
+    board then shows the later round, and only the end of the round on show
+    (``current``) calls on_end, so an earlier round ending never blanks it.
+
+    Start and end events sit in a heap keyed by monotonic deadline, and a
+    single thread sleeps until the earliest one, so nothing is rescanned per
+    tick and hundreds of rounds cost O(log n) per event. Edits don't search
+    the heap: every add or update gives the round a fresh version from one
+    increasing sequence, and events of removed or changed rounds are dropped
+    when they reach the top.
+    """
+
+    def __init__(self, on_start, on_end, log_debug=None):
+        self.on_start = on_start
+        self.on_end = on_end
+        self.current = None     # id of the round on show
+        self.log_debug = log_debug if log_debug else logging.debug
+        self.rounds: dict[int, Round] = {}
+        self.heap = []
+        self.cond = threading.Condition()
+        self.running = False
+        self.thread = None
+        self._ids = itertools.count()
+        self._seq = itertools.count()
+        self._versions = itertools.count()
+
+    def __len__(self):
+        return len(self.rounds)
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        if self.thread:
+            self.thread.join(timeout=1)
+
+    def load(self, path, day=None, period="5") -> int:
+        """Add every round from a schedule file; return how many."""
+        return self.add_all(load_rounds(path, day, period))
+
+    def add_all(self, rounds) -> int:
+        """Add already parsed rounds; return how many."""
+        for round_ in rounds:
+            self.add(round_)
+        return len(rounds)
+
+    def add(self, round_: Round) -> int:
+        """Schedule a round; return its id for later edits."""
+        round_id = next(self._ids)
+        with self.cond:
+            round_.version = next(self._versions)
+            self.rounds[round_id] = round_
+            self._push(round_id, round_)
+        return round_id
+
+    def update(self, round_id: int, round_: Round) -> None:
+        """Replace a round (e.g. a moved start time)."""
+        with self.cond:
+            round_.version = next(self._versions)
+            self.rounds[round_id] = round_
+            self._push(round_id, round_)
+
+    def remove(self, round_id: int) -> None:
+        with self.cond:
+            self.rounds.pop(round_id, None)
+
+    def clear(self) -> None:
+        with self.cond:
+            self.rounds.clear()
+            self.heap.clear()
+
+    def _push(self, round_id, round_):
+        """Queue a round's events. Call with self.cond held."""
+        now_wall, now = datetime.now(), time.monotonic()
+        end = now + (round_.end - now_wall).total_seconds()
+        if end <= now:
+            return  # already over
+        start = now + (round_.start - now_wall).total_seconds()
+        heapq.heappush(self.heap, (start, START, next(self._seq), round_id, round_.version))
+        heapq.heappush(self.heap, (end, END, next(self._seq), round_id, round_.version))
+        self.cond.notify_all()
+
+    def _next_event(self):
+        """Block until the earliest live event is due; return it or None."""
+        with self.cond:
+            while self.running:
+                if not self.heap:
+                    self.cond.wait()
+                    continue
+                due, kind, _, round_id, version = self.heap[0]
+                round_ = self.rounds.get(round_id)
+                if round_ is None or round_.version != version:
+                    heapq.heappop(self.heap)  # removed or edited since
+                    continue
+                wait = due - time.monotonic()
+                if wait > 0:
+                    self.cond.wait(wait)
+                    continue
+                heapq.heappop(self.heap)
+                if kind == END:
+                    del self.rounds[round_id]
+                return kind, round_id, round_
+            return None
+
+    def _run(self):
+        while True:
+            event = self._next_event()
+            if event is None:
+                break
+            try:
+                self._fire(*event)
+            except Exception as e:
+                logging.error(f"Schedule action failed: {e}")
+
+    def _fire(self, kind, round_id, round_):
+        """Run the action for one event (schedule thread)."""
+        if kind == START:
+            self.current = round_id
+            self.log_debug(f"Schedule: start {round_}")
+            self.on_start(round_.configuration)
+        elif round_id == self.current:
+            self.current = None
+            self.log_debug(f"Schedule: end {round_}")
+            self.on_end(round_)
+        else:
+            self.log_debug(f"Schedule: end {round_}, a later round is on show")
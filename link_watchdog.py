@@ -0,0 +1,206 @@
+"""
+Link watchdog: notices a board that stopped answering or a write that never
+completes, even when no serial call raises (a pulled RS-232 cable usually
+does not).
+
+Each SerialSender has a LinkWatchdog; one shared WatchdogThread checks all of
+them, sleeping until the earliest pending deadline. A link that arms an
+earlier deadline (a write starts, a frame awaits its reply) wakes the thread
+to re-plan; with nothing pending it sleeps until something is. Deadlines:
+
+- write_timeout: a write still running after this long -> "dead"
+- reply_timeout: once a board has answered TRUST frames in a row, a frame
+  still unanswered after this long -> "degraded"
+- dead_timeout: ... and after this long -> "dead"
+- heartbeat: with nothing written for this long, resend the next cyclic
+  frame so the board is checked even on long periods (None = off)
+
+Degraded/dead are reported through on_failure(status); the first reply
+after that through on_reconnect(). So for a replying board, silence is
+detected reply_timeout after the first unanswered frame.
+"""
+import math
+import threading
+import time
+
+TRUST = 3     # frames answered in a row before missing replies count
+
+
+class LinkWatchdog:
+    """Deadline tracking for one link."""
+
+    def __init__(self, sender, reply_timeout=0.5, dead_timeout=2.0, write_timeout=1.0,
+                 heartbeat=None):
+        self.sender = sender
+        self.reply_timeout = reply_timeout
+        self.dead_timeout = dead_timeout
+        self.write_timeout = write_timeout
+        self.heartbeat = heartbeat
+        self.lock = threading.Lock()
+        self.status = "ok"
+        self.answering = False      # the board answers every frame
+        self._streak = 0            # frames answered in a row
+        self.detections = []        # (status, seconds from last sign of life to report)
+        self._writing = None        # start of the write in progress
+        self._awaiting = None       # write end of the oldest unanswered frame
+        self._last_write = time.monotonic()
+        self.thread = None          # the WatchdogThread checking this link
+
+    def _arm(self, deadline) -> None:
+        """A new deadline: make sure the thread wakes up for it."""
+        thread = self.thread
+        if thread is not None:
+            thread.poke(deadline)
+
+    def reset(self) -> None:
+        """Forget pending deadlines, e.g. after the port was reopened."""
+        with self.lock:
+            self.status = "ok"
+            self._writing = self._awaiting = None
+            self._last_write = time.monotonic()
+        if self.heartbeat:
+            self._arm(self._last_write + self.heartbeat)
+
+    def write_started(self, now) -> None:
+        self._writing = now
+        self._arm(now + self.write_timeout)
+
+    def write_done(self, now) -> None:
+        deadline = now + self.heartbeat if self.heartbeat else math.inf
+        with self.lock:
+            self._writing = None
+            self._last_write = now
+            if self._awaiting is None:
+                self._awaiting = now
+                if self.answering:
+                    deadline = min(deadline, now + self.reply_timeout)
+            elif not self.answering:
+                self._streak = 0    # the previous frame got no reply
+            # Without replies, a write that completes is the only sign of life.
+            recovered = not self.answering and self.status != "ok"
+            if recovered:
+                self.status = "ok"
+        self._arm(deadline)
+        if recovered:
+            self.sender.log_debug("Writes completing again")
+            self.sender.on_reconnect()
+
+    def reply(self, now) -> None:
+        with self.lock:
+            if self._awaiting is not None:
+                self._streak += 1
+                self.answering = self.answering or self._streak >= TRUST
+            self._awaiting = None
+            recovered = self.status != "ok"
+            self.status = "ok"
+        if recovered:
+            self.sender.log_debug("Board answering again")
+            self.sender.on_reconnect()
+
+    def next_deadline(self) -> float | None:
+        """Monotonic time at which check() could next report something."""
+        deadlines = []
+        with self.lock:
+            if self._writing is not None:
+                deadlines.append(self._writing + self.write_timeout)
+            if self.answering and self._awaiting is not None and self.status != "dead":
+                timeout = self.reply_timeout if self.status == "ok" else self.dead_timeout
+                deadlines.append(self._awaiting + timeout)
+            if self.heartbeat:
+                deadlines.append(self._last_write + self.heartbeat)
+        return min(deadlines, default=None)
+
+    def check(self, now) -> None:
+        """Called by the WatchdogThread: report deadlines that passed."""
+        if not self.sender._serving():
+            return
+        status = since = what = None
+        heartbeat = False
+        with self.lock:
+            if self._writing is not None and now - self._writing > self.write_timeout:
+                status, since, what = "dead", self._writing, "write stalled"
+            elif self.answering and self._awaiting is not None:
+                silent = now - self._awaiting
+                if silent > self.dead_timeout:
+                    status, since, what = "dead", self._awaiting, "no reply"
+                elif silent > self.reply_timeout:
+                    status, since, what = "degraded", self._awaiting, "no reply"
+            if self.heartbeat and self._writing is None and now - self._last_write > self.heartbeat:
+                heartbeat = True
+                self._last_write = now
+            if status is None or status == self.status or self.status == "dead":
+                status = None
+            else:
+                self.status = status
+                self.detections.append((status, now - since))
+        if heartbeat:
+            self.sender._heartbeat()
+        if status:
+            self.sender.log_debug(f"Link {status}: {what} for {(now - since) * 1000:.0f} ms")
+            self.sender.on_failure(status)
+
+
+class WatchdogThread:
+    """One daemon thread checking every registered LinkWatchdog.
+
+    ``wake`` is when it next checks; poke() moves it earlier.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.watchdogs = set()
+        self.cond = threading.Condition()
+        self.wake = math.inf
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def get(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def add(self, watchdog) -> None:
+        watchdog.thread = self
+        with self.cond:
+            self.watchdogs.add(watchdog)
+            self.wake = 0
+            self.cond.notify()
+
+    def remove(self, watchdog) -> None:
+        watchdog.thread = None
+        with self.cond:
+            self.watchdogs.discard(watchdog)
+
+    def poke(self, deadline) -> None:
+        """Check again by deadline (monotonic) at the latest."""
+        if deadline >= self.wake:
+            return      # already due to wake up in time; the common case
+        with self.cond:
+            if deadline < self.wake:
+                self.wake = deadline
+                self.cond.notify()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.watchdogs)
+                watchdogs = list(self.watchdogs)
+                self.wake = math.inf    # pokes during the pass lower it again
+            now = time.monotonic()
+            wake = math.inf
+            for watchdog in watchdogs:
+                watchdog.check(now)
+                deadline = watchdog.next_deadline()
+                if deadline is not None:
+                    wake = min(wake, deadline)
+            with self.cond:
+                self.wake = wake = min(wake, self.wake)
+                if wake == math.inf:
+                    self.cond.wait()
+                else:
+                    # Just past the deadline, so check() sees it as expired.
+                    self.cond.wait(max(0.001, wake - time.monotonic() + 0.001))
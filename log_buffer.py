@@ -0,0 +1,35 @@
+import itertools
+from collections import deque
+
+
+class LogBuffer:
+    """Bounded ring buffer of log lines: any thread appends, one thread drains.
+
+    deque.append and deque.popleft are atomic in CPython, so writers (serial
+    worker threads) never take a lock or touch Tk. When the buffer is full
+    the oldest lines are overwritten; sequence numbers let drain() count
+    how many were lost.
+    """
+
+    def __init__(self, size=1000):
+        self.lines = deque(maxlen=size)
+        self.dropped = 0
+        self._sequence = itertools.count()
+        self._next = 0
+
+    def append(self, line: str) -> None:
+        self.lines.append((next(self._sequence), line))
+
+    def drain(self) -> list[str]:
+        """Remove and return every buffered line, oldest first."""
+        out = []
+        try:
+            while True:
+                sequence, line = self.lines.popleft()
+                if sequence >= self._next:
+                    self.dropped += sequence - self._next
+                    self._next = sequence + 1
+                out.append(line)
+        except IndexError:
+            pass
+        return out
@@ -1,50 +1,31 @@
 # Standard import
 from string import ascii_uppercase
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, filedialog
 import os
-import json
+import logging
+import signal
 import sys
 
 # Project-specific imports
-from serial_sender import SerialSender
-from configuration import Configuration
+from sender_manager import PROTOCOLS, SenderManager
+from port_watcher import PortWatcher
 from tkinter_clock import ClockPicker
-from custom_coder import encode_message, encode_end
+from log_buffer import LogBuffer
+from day_schedule import DaySchedule, load_rounds
+from custom_coder import encode_end
+from config_store import ConfigStore, get_config_path, load_config
+from configuration import BAUD_RATES, PERIODS
 
 
 # Constants
 SERIES = [f"{i:02}" for i in range(100)]
 GROUPS = list(ascii_uppercase[:4])
-PERIODS = ["3", "5", "10", "20", "30"]
-BAUD_RATES = [9600, 19200, 38400, 57600, 115200]
-
-def get_config_path():
-    if getattr(sys, 'frozen', False):
-        base_dir = os.path.join(os.getenv("APPDATA"), "Ventus-App")
-    else:
-        base_dir = os.path.dirname(__file__)
-    os.makedirs(base_dir, exist_ok=True)
-    return os.path.join(base_dir, "config.json")
-
-def save_config(config: Configuration):
-    try:
-        with open(get_config_path(), "w") as f:
-            json.dump(config.to_dict(), f, indent=4)
-    except Exception as e:
-        print("Failed to save config:", e)
-
-def load_config() -> Configuration:
-    path = get_config_path()
-    if os.path.exists(path):
-        try:
-            with open(path, "r") as f:
-                data = json.load(f)
-                return Configuration.from_dict(data)
-        except Exception as e:
-            print("Failed to load config:", e)
-    return Configuration()
+LOG_LINES = 4            # lines kept in the debug field by default
+LOG_SCROLLBACK = 2000    # lines kept with "Keep log" checked
+LOG_TICK_MS = 100        # how often queued log lines are drawn
+STATS_TICKS = 10         # stats panel refresh, in log ticks
 
 class MainApplication(tk.Tk):
     """Main GUI application for the Display Controller."""
@@ -52,14 +33,39 @@ class MainApplication(tk.Tk):
     def __init__(self) -> None:
         super().__init__()
         self.title("Display Controller")
+        self.log_buffer = LogBuffer()
+        self._status_changed = False
+        self._ticks = 0
+        self.session = datetime.now().strftime("%Y%m%d-%H%M%S")
+        self._ports_changed = False
+        self.schedules: dict[str, DaySchedule] = {}   # com_port -> its day schedule
+
+        # Get a window on screen first; configuration, serial ports and the
+        # widgets are loaded once it has been drawn.
+        self._setup_footer()
+        self.bind("<Map>", self._on_first_map)
+
+    def _on_first_map(self, event) -> None:
+        if event.widget is not self:
+            return
+        self.unbind("<Map>")
+        self.after_idle(self._load)
+
+    def _load(self) -> None:
+        """Second half of start-up, run after the first draw."""
         self.configuration = load_config()
-        self.serial_sender: SerialSender | None = None
+        self.config_store = ConfigStore()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.senders = SenderManager(on_status=self.sending_failed, log_debug=self.log_debug)
+        self.port_watcher = PortWatcher(on_change=self.ports_changed)
+        self.port_watcher.start()
 
         self._setup_main_frame()
         self._setup_choice_frames()
         self._setup_com_frame()
         self._setup_debug_field()
-        self._setup_footer()
+        self._setup_stats_panel()
+        self.after(LOG_TICK_MS, self._drain_log)
 
     # -------------------- UI Setup -------------------- #
     def _setup_main_frame(self) -> None:
@@ -88,10 +94,19 @@ class MainApplication(tk.Tk):
         self.group.pack(fill="x")
         self.frame_choice2.grid(row=1, column=2, padx=5, pady=5)        
 
-        # A = Right checkbox
+        # A = Right, Countdown, Adaptive pacing and Own process checkboxes
+        self.frame_checks = tk.Frame(self.frame)
         self.a_right_var = tk.BooleanVar(self.frame, value=self.configuration.a_right or False)
-        tk.Checkbutton(self.frame, text="A = Right", variable=self.a_right_var)\
-            .grid(row=2, column=2, padx=5, pady=5)
+        tk.Checkbutton(self.frame_checks, text="A = Right", variable=self.a_right_var).pack(anchor="w")
+        self.countdown_var = tk.BooleanVar(self.frame, value=False)
+        tk.Checkbutton(self.frame_checks, text="Countdown", variable=self.countdown_var).pack(anchor="w")
+        self.adaptive_var = tk.BooleanVar(self.frame, value=False)
+        tk.Checkbutton(self.frame_checks, text="Adaptive", variable=self.adaptive_var,
+                       command=self.pacing_changed).pack(anchor="w")
+        self.isolate_var = tk.BooleanVar(self.frame, value=False)
+        tk.Checkbutton(self.frame_checks, text="Own process", variable=self.isolate_var)\
+            .pack(anchor="w")
+        self.frame_checks.grid(row=2, column=2, padx=5, pady=5)
 
         # Close time picker
         self.clock2 = ClockPicker(
@@ -105,8 +120,10 @@ class MainApplication(tk.Tk):
         self.clock1.grid(row=2, column=1, padx=5, pady=5)
 
         if self.configuration.open_time:
-           self.clock1.set_time(self.configuration.open_time)
-           self.clock2.set_time(self.configuration.close_time) 
+           # The saved times carry the day they were saved; the clocks mean today.
+           today = date.today()
+           self.clock1.set_time(datetime.combine(today, self.configuration.open_time.time()))
+           self.clock2.set_time(datetime.combine(today, self.configuration.close_time.time()))
         else:
             self.clock1._on_change()
 
@@ -125,10 +142,16 @@ class MainApplication(tk.Tk):
         tk.Label(self.row1, text="COM").pack(side=tk.LEFT)
         self.com_port_combo = ttk.Combobox(self.row1, values=[], state="readonly")
         self.com_port_combo.bind("<Button-1>", lambda e: self.refresh_ports())
+        self.com_port_combo.bind("<<ComboboxSelected>>", lambda e: self.update_board_controls())
         self.com_port_combo.pack(side=tk.LEFT, fill="x", expand=True)
         self.baud_rate_combo = ttk.Combobox(self.row1, values=BAUD_RATES, state="readonly", width=6)
         self.baud_rate_combo.set(BAUD_RATES[0])
         self.baud_rate_combo.pack(side=tk.RIGHT, padx=5)
+        # Frame format of the board: ASCII frames, compact checksummed frames,
+        # or "auto" to probe the board and use compact if it answers.
+        self.protocol_combo = ttk.Combobox(self.row1, values=PROTOCOLS, state="readonly", width=7)
+        self.protocol_combo.set(PROTOCOLS[0])
+        self.protocol_combo.pack(side=tk.RIGHT)
         self.row1.pack(fill="x", pady=2)
 
         # Row 2: Status and buttons
@@ -141,14 +164,34 @@ class MainApplication(tk.Tk):
         self.connect_button.pack(side=tk.LEFT)
         self.display_button = ttk.Button(self.row2, text="Display", command=self.display)
         self.display_button.pack(side=tk.LEFT)
+        self.schedule_button = ttk.Button(self.row2, text="Schedule...", command=self.load_schedule)
+        self.schedule_button.pack(side=tk.LEFT)
+        self.boards_label = tk.Label(self.row2, text=self.senders.summary())
+        self.boards_label.pack(side=tk.LEFT, padx=6)
         self.row2.pack(fill="x", pady=2)
 
         self.frame_choice4.grid(row=4, column=0, columnspan=3, pady=10)
 
     def _setup_debug_field(self) -> None:
         """Create a debug text field at the bottom."""
-        self.debug_field = tk.Text(self.frame, height=5, width=50, state="disabled", bg="#f0f0f0")
-        self.debug_field.grid(row=5, column=0, columnspan=3, pady=10)
+        self.debug_frame = tk.Frame(self.frame)
+        self.debug_field = tk.Text(self.debug_frame, height=5, width=50, state="disabled", bg="#f0f0f0")
+        scrollbar = ttk.Scrollbar(self.debug_frame, command=self.debug_field.yview)
+        self.debug_field.config(yscrollcommand=scrollbar.set)
+        self.debug_field.pack(side=tk.LEFT, fill="both", expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill="y")
+        self.debug_frame.grid(row=5, column=0, columnspan=3, pady=(10, 0))
+
+        self.scrollback_var = tk.BooleanVar(self.frame, value=False)
+        tk.Checkbutton(self.frame, text="Keep log", variable=self.scrollback_var)\
+            .grid(row=6, column=2, sticky="e")
+
+    def _setup_stats_panel(self) -> None:
+        """Create a one-line link stats view with an export button."""
+        self.stats_label = tk.Label(self.frame, text="", font=("Arial", 8), anchor="w")
+        self.stats_label.grid(row=7, column=0, columnspan=2, sticky="w")
+        ttk.Button(self.frame, text="Export stats", command=self.export_stats)\
+            .grid(row=7, column=2, sticky="e")
 
     def _setup_footer(self) -> None:
         """Create footer with version info."""
@@ -156,16 +199,32 @@ class MainApplication(tk.Tk):
         self.footer.pack(side=tk.BOTTOM)
 
     def log_debug(self, message: str) -> None:
-        """Append a line to the debug field and trim to last 4 lines."""
-        self.debug_field.config(state="normal")
-        self.debug_field.insert("end", message + "\n")
-        self.debug_field.see("end")
-
-        lines = self.debug_field.get("1.0", "end-1c").splitlines()
-        if len(lines) > 4:
-            self.debug_field.delete("1.0", "end")
-            self.debug_field.insert("end", "\n".join(lines[-4:]) + "\n")
-        self.debug_field.config(state="disabled")
+        """Queue a line for the debug field. Safe to call from any thread."""
+        self.log_buffer.append(message)
+
+    def _drain_log(self) -> None:
+        """Draw queued log lines in one batch and trim the oldest ones."""
+        lines = self.log_buffer.drain()
+        if lines:
+            self.debug_field.config(state="normal")
+            self.debug_field.insert("end", "\n".join(lines) + "\n")
+            limit = LOG_SCROLLBACK if self.scrollback_var.get() else LOG_LINES
+            # The text always ends with an empty line after the last newline.
+            excess = int(self.debug_field.index("end-1c").split(".")[0]) - 1 - limit
+            if excess > 0:
+                self.debug_field.delete("1.0", f"{excess + 1}.0")
+            self.debug_field.see("end")
+            self.debug_field.config(state="disabled")
+        if self._status_changed:
+            self._status_changed = False
+            self.update_board_controls()
+        if self._ports_changed:
+            self._ports_changed = False
+            self.refresh_ports()
+        self._ticks += 1
+        if self._ticks % STATS_TICKS == 0:
+            self.update_stats()
+        self.after(LOG_TICK_MS, self._drain_log)
 
     def get_configuration(self) -> None:
         self.configuration.series = self.series.get()
@@ -176,80 +235,170 @@ class MainApplication(tk.Tk):
         self.configuration.a_right = self.a_right_var.get()
         # self.configuration.com_port = self.com_port_combo.get()
 
-        save_config(self.configuration)
+        self.config_store.save(self.configuration)
 
     def display(self) -> None:
         """Gather configuration and send to device if valid."""
         self.get_configuration()
 
         if self.configuration.check_configuration():
-            # print(json.dumps(self.configuration.__dict__, default=str, indent=2))
+            self.config_store.record(self.configuration)
             self.send_to_device()
         else:
             self.log_debug("Configuration is incomplete or invalid")
 
     def connect(self) -> None:
-        """Connect to the serial device."""
-        if not self.com_port_combo.get():
+        """Connect the board on the selected serial port."""
+        com_port = self.com_port_combo.get()
+        if not com_port:
             self.log_debug("Select a COM port first")
             return
-        self.com_port = self.com_port_combo.get()
         self.configuration.period = self.period.get()
-        self.serial_sender = SerialSender(
-            com_port=self.com_port,
-            speed=self.baud_rate_combo.get(),
-            on_failure=lambda: self.sending_failed(),
-            log_debug=self.log_debug
-        )
-        self.serial_sender.start()
-        self.status_canvas.itemconfig(self.status_oval, fill="green")
-        self.connect_button.config(text="Disconnect", command=self.disconnect)
-        self.log_debug("Connected to " + self.com_port)
-        self.com_port_combo.config(state="disabled")
-        self.baud_rate_combo.config(state="disabled")
+        # Own process: this board's serial I/O runs in a child process, so
+        # GUI work cannot delay its frames.
+        self.senders.add(com_port, self.baud_rate_combo.get(), self.configuration,
+                         protocol=self.protocol_combo.get(),
+                         backend="process" if self.isolate_var.get() else None)
+        self.log_debug("Connected to " + com_port)
+        self.update_board_controls()
 
     def disconnect(self) -> None:
-        """Disconnect from the serial device."""
-        self.finalise_sending()
-        if self.serial_sender:
-            self.serial_sender.stop()
-        self.status_canvas.itemconfig(self.status_oval, fill="gray")
-        self.connect_button.config(text="Connect", command=self.connect)
-        self.log_debug("Disconnected from " + self.com_port)
-        self.com_port = None
-        self.com_port_combo.config(state="enabled")
-        self.baud_rate_combo.config(state="enabled")
+        """Disconnect the board on the selected serial port."""
+        com_port = self.com_port_combo.get()
+        schedule = self.schedules.pop(com_port, None)
+        if schedule:
+            schedule.stop()
+        self.senders.remove(com_port)
+        self.log_debug("Disconnected from " + com_port)
+        self.update_board_controls()
 
     def send_to_device(self) -> None:
-        """Send configuration data to the connected device."""
-        if not self.serial_sender:
+        """Send configuration data to the selected board."""
+        if not self.senders.display(self.com_port_combo.get(), self.configuration,
+                                    countdown=self.countdown_var.get()):
             self.log_debug("Not connected to any device.")
             return
-        messages = encode_message(self.configuration)
-        self.after(0, self.serial_sender.clear_queue())
-        for message in messages:
-            self.after(0, self.serial_sender.send, message)
-        self.display_button.config(text="Finish", command=self.finalise_sending)
+        self.update_board_controls()
+
+    def pacing_changed(self) -> None:
+        """Apply the Adaptive checkbox to every connected board."""
+        mode = "adaptive" if self.adaptive_var.get() else "fixed"
+        self.senders.set_pacing(mode)
+        self.log_debug(f"Pacing: {mode}")
 
     def finalise_sending(self) -> None:
-        self.serial_sender.clear_queue()
-        self.serial_sender.send_flush(encode_end())
-        self.display_button.config(text="Display", command=self.display)
+        self.senders.finish(self.com_port_combo.get())
+        self.update_board_controls()
 
     def force_end(self) -> None:
-        self.serial_sender.clear_queue()
-        for i in range(4):
-            self.serial_sender.send_flush(encode_end())
-        self.display_button.config(text="Display", command=self.display)
+        board = self.senders.get(self.com_port_combo.get())
+        if board is None:
+            return
+        self.senders.finish(board)
+        for i in range(3):
+            board.sender.send_flush(encode_end())
+        self.update_board_controls()
+
+    def load_schedule(self) -> None:
+        """Run a day schedule file on the selected board."""
+        com_port = self.com_port_combo.get()
+        if com_port not in self.senders:
+            self.log_debug("Connect a board before loading a schedule")
+            return
+        path = filedialog.askopenfilename(filetypes=[("Schedule", "*.csv"), ("All files", "*.*")])
+        if not path:
+            return
+        # Parse first: a bad file leaves the board's running schedule alone.
+        try:
+            rounds = load_rounds(path, period=self.period.get())
+        except Exception as e:
+            self.log_debug(f"Failed to load schedule: {e}")
+            return
+        old = self.schedules.pop(com_port, None)
+        if old:
+            old.stop()
+        schedule = DaySchedule(
+            on_start=lambda config: self._scheduled(self.senders.display, com_port, config),
+            on_end=lambda round_: self._scheduled(self.senders.finish, com_port),
+            log_debug=lambda message: self.log_debug(f"[{com_port}] {message}"),
+        )
+        count = schedule.add_all(rounds)
+        schedule.start()
+        self.schedules[com_port] = schedule
+        self.log_debug(f"Loaded {count} rounds for {com_port}")
+
+    def _scheduled(self, action, *args) -> None:
+        """Run a schedule action (schedule thread) and refresh the controls."""
+        action(*args)
+        self._status_changed = True
 
     def sending_failed(self) -> None:
-        self.status_canvas.itemconfig(self.status_oval, fill="red")
+        """Called from serial threads: picked up on the next log tick."""
+        self._status_changed = True
+
+    def update_stats(self) -> None:
+        """Show the selected board's link telemetry."""
+        board = self.senders.get(self.com_port_combo.get())
+        self.stats_label.config(text=board.sender.telemetry.summary_line() if board else "")
+
+    def export_stats(self) -> None:
+        """Write this session's telemetry for every board next to the config."""
+        directory = os.path.dirname(get_config_path())
+        for path in self.senders.export_telemetry(directory, f"stats-{self.session}"):
+            self.log_debug("Stats exported to " + path)
+
+    def update_board_controls(self) -> None:
+        """Sync LED, buttons and aggregate status with the selected board."""
+        board = self.senders.get(self.com_port_combo.get())
+        if board is None:
+            self.status_canvas.itemconfig(self.status_oval, fill="gray")
+            self.connect_button.config(text="Connect", command=self.connect)
+            self.display_button.config(text="Display", command=self.display)
+            self.baud_rate_combo.config(state="readonly")
+            self.protocol_combo.config(state="readonly")
+        else:
+            color = {"connected": "green", "degraded": "orange"}.get(board.status, "red")
+            self.status_canvas.itemconfig(self.status_oval, fill=color)
+            self.connect_button.config(text="Disconnect", command=self.disconnect)
+            if board.displaying:
+                self.display_button.config(text="Finish", command=self.finalise_sending)
+            else:
+                self.display_button.config(text="Display", command=self.display)
+            self.baud_rate_combo.config(state="disabled")
+            self.protocol_combo.config(state="disabled")
+        self.boards_label.config(text=self.senders.summary())
+
+    def on_close(self) -> None:
+        """Blank the boards and write pending configuration before exiting."""
+        for schedule in self.schedules.values():
+            schedule.stop()
+        self.senders.finish_all()
+        for board in list(self.senders.boards.values()):
+            board.sender.stop(drain=True)
+        self.config_store.flush()
+        self.destroy()
+
+    def ports_changed(self, added, removed) -> None:
+        """Called from the port watcher thread on hot-plug."""
+        for port in added:
+            self.log_debug("Port added: " + port)
+        for port in removed:
+            self.log_debug("Port removed: " + port)
+        self._ports_changed = True
 
     def refresh_ports(self) -> None:
-        """Refresh the available COM ports."""
-        ports = SerialSender.list_ports()
-        self.com_port_combo['values'] = [p.device for p in ports]
+        """Refresh the available COM ports from the watcher's cache."""
+        self.com_port_combo['values'] = self.port_watcher.ports
+
+def _handle_sigint(sig, frame):
+    logging.info("Interrupted, exiting...")
+    sys.exit(0)
 
 if __name__ == "__main__":
+    if getattr(sys, "frozen", False):
+        import multiprocessing
+        multiprocessing.freeze_support()  # "Own process" boards in the frozen build
+    logging.basicConfig(level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(message)s")
+    signal.signal(signal.SIGINT, _handle_sigint)
     app = MainApplication()
     app.mainloop()
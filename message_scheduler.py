@@ -0,0 +1,148 @@
+import time
+from collections import deque
+
+
+class MessageScheduler:
+    """Queue of frames for one serial link, split into lanes.
+
+    - priority: sent as soon as possible, ignores pacing (e.g. the blank
+      frame on Finish)
+    - ticker: frames built just in time at fixed deadlines (countdown)
+    - paced: one-shot frames, at most one per period
+    - cyclic: frames that keep rotating at the period until replaced
+
+    Paced frames go before cyclic ones; both share the same pacing slot.
+    Ticker frames have their own deadlines and never use that slot, so
+    they cannot starve the cycle.
+    Every lane is a deque, so enqueue and dequeue are O(1). One-shot lanes
+    keep (message, enqueue time) pairs; after pop(), ``enqueued`` holds the
+    enqueue time of the frame just released (its due time for cyclic ones).
+    """
+
+    def __init__(self, period=0, max_size=32):
+        self.period = float(period)
+        self.max_size = max_size
+        self.priority = deque()
+        self.paced = deque()
+        self.cyclic = deque()
+        self.last_paced_time = None
+        self.enqueued = None
+        self.ticker = None
+        self.tick = 0
+
+        # Counters
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self.priority) + len(self.paced) + len(self.cyclic)
+
+    def _push(self, lane, message, coalesce):
+        if coalesce and lane and lane[-1][0] == message:
+            self.coalesced += 1
+            return
+        if len(lane) >= self.max_size:
+            lane.popleft()
+            self.dropped += 1
+        lane.append((message, time.monotonic()))
+
+    def push_priority(self, message):
+        """Queue a frame that goes out immediately. Repeats are kept: they are deliberate."""
+        self._push(self.priority, message, coalesce=False)
+
+    def push_paced(self, message):
+        """Queue a one-shot frame that respects the period; a repeat of the last is dropped."""
+        self._push(self.paced, message, coalesce=True)
+
+    def set_cycle(self, messages):
+        """Replace the cyclic frames. The same set again keeps its rotation."""
+        messages = list(messages)
+        if len(messages) > self.max_size:
+            self.dropped += len(messages) - self.max_size
+            messages = messages[:self.max_size]
+        if sorted(messages) == sorted(self.cyclic):
+            self.coalesced += 1
+            return
+        self.cyclic = deque(messages)
+
+    def requeue(self, message):
+        """Put back a frame that could not be written, to go out first."""
+        if self.cyclic and self.cyclic[-1] is message:
+            self.cyclic.rotate(1)
+        else:
+            self.priority.appendleft((message, self.enqueued))
+        self.last_paced_time = None
+
+    def set_ticker(self, first_due, interval, make_frame):
+        """Emit make_frame(k) at monotonic first_due + k * interval.
+
+        Deadlines are computed from first_due every time, so lateness of one
+        frame never shifts the next. If frames were missed, only the latest
+        is sent. The ticker ends when make_frame returns None.
+        """
+        self.ticker = (first_due, interval, make_frame)
+        self.tick = 0
+
+    def clear(self):
+        """Drop every pending frame in all lanes."""
+        self.ticker = None
+        self.priority.clear()
+        self.paced.clear()
+        self.cyclic.clear()
+
+    def pop(self, now):
+        """Return (message, 0) if a frame is due at monotonic time ``now``.
+
+        Otherwise return (None, wait), where wait is the number of seconds
+        until the next paced slot, or None if nothing is queued at all.
+        """
+        if self.priority:
+            self.sent += 1
+            message, self.enqueued = self.priority.popleft()
+            return message, 0
+        ticker_wait = None
+        while self.ticker:
+            first_due, interval, make_frame = self.ticker
+            due = first_due + self.tick * interval
+            if due > now:
+                ticker_wait = due - now
+                break
+            # Skip ticks that are already past
+            self.tick += int((now - due) // interval)
+            self.enqueued = first_due + self.tick * interval
+            message = make_frame(self.tick)
+            self.tick += 1
+            if message is None:
+                self.ticker = None
+                break
+            self.sent += 1
+            return message, 0
+        if not self.paced and not self.cyclic:
+            return None, ticker_wait
+        due = now
+        if self.last_paced_time is not None:
+            due = self.last_paced_time + self.period
+            if due > now:
+                wait = due - now
+                return None, wait if ticker_wait is None else min(wait, ticker_wait)
+        if self.paced:
+            message, self.enqueued = self.paced.popleft()
+        else:
+            message = self.cyclic[0]
+            self.cyclic.rotate(-1)
+            self.enqueued = due
+        self.last_paced_time = now
+        self.sent += 1
+        return message, 0
+
+    def stats(self):
+        """Return queue lengths and counters as a dict."""
+        return {
+            "priority": len(self.priority),
+            "paced": len(self.paced),
+            "cyclic": len(self.cyclic),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
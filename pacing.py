@@ -0,0 +1,75 @@
+"""
+Adaptive pacing: the send period follows what the link and the board can
+take instead of staying at the operator's choice, which becomes the upper
+bound.
+
+- The wire sets the floor: a frame of n bytes takes n * 10 / baud seconds
+  (8N1), plus a margin.
+- A board that replies tells us how long it needs per frame; the period
+  never goes below a multiple of its smoothed reply time.
+- Until a board has replied there is nothing to go on, so the period stays
+  at the operator's; the first measured reply tightens it to the target.
+- Errors, or more unanswered frames than LAG_FRAMES from a board that does
+  reply, double the period; it then creeps back down by RECOVERY per frame.
+"""
+
+WIRE_MARGIN = 1.25     # period >= this many wire times of the last frame
+REPLY_MARGIN = 1.5     # period >= this many smoothed reply times
+MIN_PERIOD = 0.02      # never faster than this (s)
+LAG_FRAMES = 3         # unanswered frames before backing off
+RECOVERY = 0.9         # per-frame step back toward the target after a backoff
+SMOOTHING = 0.2        # weight of a new reply time in the running average
+
+
+class AdaptivePacer:
+    """Work out the period of one link from its baud rate and replies."""
+
+    def __init__(self, baud, ceiling):
+        self.baud = int(baud)
+        self.ceiling = float(ceiling)
+        self.period = None          # set by the first frame
+        self.reply_time = None      # smoothed reply time (s), None until one arrives
+        self.unanswered = 0
+        self.backoffs = 0
+        self._written = None        # write end of the oldest unanswered frame
+        self._nbytes = None         # size of the last frame written
+
+    def target(self, nbytes) -> float:
+        if self.reply_time is None:
+            return self.ceiling
+        target = max(nbytes * 10 / self.baud * WIRE_MARGIN, self.reply_time * REPLY_MARGIN)
+        return min(self.ceiling, max(MIN_PERIOD, target))
+
+    def frame_sent(self, nbytes, write_end) -> float:
+        """Account for a written frame and return the new period."""
+        if self._written is None:
+            self._written = write_end
+        self._nbytes = nbytes
+        self.unanswered += 1
+        if self.reply_time is not None and self.unanswered > LAG_FRAMES:
+            self.back_off()
+            self.unanswered = 0
+        elif self.period is None:
+            self.period = self.target(nbytes)
+        else:
+            self.period = max(self.target(nbytes), min(self.ceiling, self.period * RECOVERY))
+        return self.period
+
+    def reply(self, now) -> None:
+        """A reply line arrived from the board."""
+        if self._written is not None:
+            elapsed = now - self._written
+            if self.reply_time is None:
+                self.reply_time = elapsed
+                if not self.backoffs and self._nbytes is not None:
+                    self.period = self.target(self._nbytes)   # first evidence: tighten now
+            else:
+                self.reply_time += SMOOTHING * (elapsed - self.reply_time)
+        self._written = None
+        self.unanswered = 0
+
+    def back_off(self) -> float:
+        """An error or a lagging board: double the period (up to the ceiling)."""
+        self.backoffs += 1
+        self.period = min(self.ceiling, max(self.period or 0, MIN_PERIOD) * 2)
+        return self.period
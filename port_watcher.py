@@ -0,0 +1,46 @@
+import logging
+import threading
+
+from serial_sender import SerialSender
+
+
+class PortWatcher:
+    """Keeps a cached list of serial ports, refreshed in a background thread.
+
+    ``ports`` can be read at any time without touching the OS. When ports
+    appear or disappear, on_change(added, removed) is called from the
+    watcher thread.
+    """
+
+    def __init__(self, interval=2.0, on_change=None):
+        self.interval = interval
+        self.ports: list[str] = []
+        self.on_change = on_change if on_change else lambda added, removed: None
+        self._stop = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self._stop.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def scan(self):
+        """Enumerate ports once and report any change."""
+        try:
+            ports = sorted(p.device for p in SerialSender.list_ports())
+        except Exception as e:
+            logging.error(f"Port scan failed: {e}")
+            return
+        added = [p for p in ports if p not in self.ports]
+        removed = [p for p in self.ports if p not in ports]
+        self.ports = ports
+        if added or removed:
+            self.on_change(added, removed)
+
+    def _run(self):
+        self.scan()
+        while not self._stop.wait(self.interval):
+            self.scan()
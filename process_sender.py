@@ -0,0 +1,164 @@
+"""
+A SerialSender that runs in a child process, so the GUI (Tk redraws, log
+widget rebuilds) never holds the GIL the writer needs to hit its slots.
+
+Commands go to the child through a queue. Log lines, failures, reconnects and
+(when subscribed) replies come back through a second queue and are passed
+to the usual callbacks from a parent thread. Link state and counters are
+published into a small shared-memory block (sender_child.SHARED_FIELDS)
+every sender_child.PUBLISH_INTERVAL; the parent reads them through
+``telemetry`` without talking to the child. The child runs sender_child.run.
+"""
+import logging
+import multiprocessing
+import threading
+import time
+
+import sender_child
+from sender_child import SHARED_FIELDS
+from telemetry import LinkTelemetry
+
+
+class SharedTelemetry(LinkTelemetry):
+    """LinkTelemetry counters read from a child's shared-memory block.
+
+    summary() and summary_line() work as usual; records stay in the child,
+    so export() asks the child to write them.
+    """
+
+    def __init__(self, block, sender):
+        self.block = block
+        self.sender = sender
+        self.started = time.time()
+
+    def snapshot(self) -> dict:
+        while True:
+            sequence = self.block[0]
+            values = self.block[1:]
+            if sequence % 2 == 0 and self.block[0] == sequence:
+                return dict(zip(SHARED_FIELDS, values))
+            time.sleep(0)
+
+    def summary(self) -> dict:
+        counters = LinkTelemetry(size=0)
+        for name, value in self.snapshot().items():
+            if hasattr(counters, name):
+                setattr(counters, name, type(getattr(counters, name))(value))
+        return counters.summary()
+
+    def export(self, path) -> None:
+        self.sender._command("export", path)
+
+
+class ProcessSender:
+    """Drop-in for SerialSender that serves the port from a child process.
+
+    Takes the same arguments; backend is the transport used in the child.
+    Offers the same public API (start, stop, send*, set_period, set_pacing,
+    subscribe, countdown, clear_queue, period, link_up, telemetry). The
+    scheduler and its lock (messages, cond) live in the child and are not
+    reachable from here; start_ticker is not offered, since its frame
+    function would have to cross the process boundary.
+    """
+
+    def __init__(self, com_port, speed, period=0, on_failure=None, log_debug=None, backend="thread",
+                 reconnect=True, on_reconnect=None, record=None, pacing="fixed", watchdog=True):
+        self.com_port = com_port
+        self.speed = speed
+        self.running = False
+        self.log_debug = log_debug if log_debug else logging.debug
+        self.on_failure = on_failure if on_failure else lambda status="failed": None
+        self.on_reconnect = on_reconnect if on_reconnect else lambda: None
+        self.subscribers = []
+
+        context = multiprocessing.get_context("spawn")
+        self.block = context.RawArray("d", len(SHARED_FIELDS) + 1)
+        self.telemetry = SharedTelemetry(self.block, self)
+        self.commands = context.Queue()
+        self.events = context.Queue()
+        options = {"period": period, "backend": backend, "reconnect": reconnect,
+                   "record": record, "pacing": pacing, "watchdog": watchdog}
+        self.process = context.Process(
+            target=sender_child.run, args=(com_port, speed, options, self.commands, self.events, self.block),
+            daemon=True,
+        )
+        self.listener = threading.Thread(target=self._listen, daemon=True)
+
+    @property
+    def link_up(self) -> bool:
+        return bool(self.telemetry.snapshot()["link_up"])
+
+    @property
+    def period(self) -> float:
+        return self.telemetry.snapshot()["period"]
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.process.start()
+        self.listener.start()
+        self._command("start")
+
+    def stop(self, drain=False):
+        if not self.running:
+            return
+        self.running = False
+        self._command("stop", drain)
+        self.process.join(timeout=3)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=1)
+        self.events.put(("exit",))
+        self.listener.join(timeout=1)
+
+    def set_period(self, period):
+        self._command("set_period", period)
+
+    def set_pacing(self, mode):
+        self._command("set_pacing", mode)
+
+    def send(self, message):
+        self._command("send", message)
+
+    def send_flush(self, message):
+        self._command("send_flush", message)
+
+    def send_cycle(self, messages):
+        self._command("send_cycle", list(messages))
+
+    def send_update(self, frames):
+        self._command("send_update", list(frames))
+
+    def subscribe(self, callback):
+        if not self.subscribers:
+            self._command("subscribe")
+        self.subscribers.append(callback)
+
+    def start_countdown(self, close_time):
+        self._command("start_countdown", close_time)
+
+    def stop_countdown(self):
+        self._command("stop_countdown")
+
+    def clear_queue(self):
+        self._command("clear_queue")
+
+    def _command(self, name, *args):
+        self.commands.put((name, args))
+
+    def _listen(self):
+        """Parent thread: hand the child's events to the callbacks."""
+        while True:
+            event, *args = self.events.get()
+            if event == "exit":
+                break
+            if event == "log":
+                self.log_debug(*args)
+            elif event == "failure":
+                self.on_failure(*args)
+            elif event == "reconnect":
+                self.on_reconnect()
+            elif event == "reply":
+                for callback in self.subscribers:
+                    callback(*args)
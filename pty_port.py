@@ -0,0 +1,54 @@
+import os
+import pty
+import select
+import time
+import tty
+
+
+class PtyPort:
+    """A pseudo-terminal pair that stands in for a serial port (POSIX only).
+
+    Hand ``device`` to SerialSender as the COM port; whatever it writes can be
+    read back from the master side, and anything written with write() shows
+    up as a reply from the "board".
+    """
+
+    def __init__(self):
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.master)
+        tty.setraw(self.slave)
+        self.device = os.ttyname(self.slave)
+        self.buffer = b""
+
+    def fileno(self):
+        return self.master
+
+    def read_available(self, timeout=0) -> bytes:
+        """Return whatever bytes arrive within timeout (possibly none)."""
+        data = self.buffer
+        self.buffer = b""
+        if select.select([self.master], [], [], timeout)[0]:
+            data += os.read(self.master, 65536)
+        return data
+
+    def read_frame(self, timeout=1.0) -> bytes | None:
+        """Return the next CRLF-terminated frame without CRLF, or None."""
+        deadline = time.monotonic() + timeout
+        while b"\r\n" not in self.buffer:
+            left = deadline - time.monotonic()
+            if left <= 0 or not select.select([self.master], [], [], left)[0]:
+                return None
+            self.buffer += os.read(self.master, 65536)
+        frame, self.buffer = self.buffer.split(b"\r\n", 1)
+        return frame
+
+    def write(self, data: bytes) -> None:
+        """Send bytes to the sender, as if the board replied."""
+        os.write(self.master, data)
+
+    def close(self) -> None:
+        for fd in (self.master, self.slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
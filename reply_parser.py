@@ -0,0 +1,62 @@
+from custom_coder import decode_reply
+
+
+class ReplyParser:
+    """Incremental splitter for the byte stream coming back from a board.
+
+    Bytes are copied once into a fixed bytearray; complete lines are parsed
+    straight from memoryview slices of it, so nothing is copied while
+    splitting. Unparsed bytes are moved back to the front only when the
+    buffer end is reached. A line longer than the buffer is dropped up to
+    its line end and counted in ``overflows``. feed() never blocks: a
+    partial line simply waits in the buffer for the rest of its bytes.
+    """
+
+    def __init__(self, capacity=4096):
+        self.buffer = bytearray(capacity)
+        self.view = memoryview(self.buffer)
+        self.start = 0      # first byte not yet parsed
+        self.end = 0        # one past the last byte received
+        self.overflows = 0
+        self._skipping = False  # rest of an overflowed line still to come
+
+    def feed(self, data) -> list[dict]:
+        """Add received bytes and return the replies they completed."""
+        replies = []
+        data = memoryview(data)
+        while data:
+            if self.end == len(self.buffer):
+                self._make_room()
+            count = min(len(data), len(self.buffer) - self.end)
+            scan = self.end
+            self.view[scan:scan + count] = data[:count]
+            self.end += count
+            data = data[count:]
+            self._split(scan, replies)
+        return replies
+
+    def pending(self) -> int:
+        """Bytes of an incomplete line waiting for their terminator."""
+        return self.end - self.start
+
+    def _split(self, scan, replies):
+        while (newline := self.buffer.find(b"\n", scan, self.end)) >= 0:
+            if self._skipping:
+                self._skipping = False
+            elif reply := decode_reply(str(self.view[self.start:newline], "ascii", "replace")):
+                replies.append(reply)
+            self.start = scan = newline + 1
+        if self.start == self.end:
+            self.start = self.end = 0
+
+    def _make_room(self):
+        if self.start == 0:
+            # A whole buffer without a line end: not a reply, drop it.
+            if not self._skipping:
+                self.overflows += 1     # once per line, however long
+            self._skipping = True
+            self.end = 0
+            return
+        size = self.end - self.start
+        self.view[:size] = self.view[self.start:self.end]
+        self.start, self.end = 0, size
@@ -0,0 +1,69 @@
+"""
+Entry point of a ProcessSender's child process.
+
+Kept apart from process_sender and free of GUI imports. Spawn still
+imports the parent's script in the child, but not as __main__, so main.py
+only costs each child its imports; no window is ever built there.
+"""
+import signal
+import threading
+import time
+
+SHARED_FIELDS = ("link_up", "frames", "bytes", "replies", "write_errors", "read_errors",
+                 "reconnects", "queue_drops", "write_time", "write_time_max", "queue_time",
+                 "reply_time", "period")
+PUBLISH_INTERVAL = 0.05   # seconds between shared-memory updates
+
+
+def publish(sender, block):
+    """Copy the sender's counters into block, seqlock style.
+
+    block[0] is odd while a write is in progress, so a reader that sees the
+    same even value before and after copying has a consistent snapshot.
+    """
+    telemetry = sender.telemetry
+    block[0] += 1
+    for index, name in enumerate(SHARED_FIELDS, start=1):
+        if name == "link_up":
+            value = sender.link_up
+        elif name == "period":
+            value = sender.period
+        else:
+            value = getattr(telemetry, name)
+        block[index] = value
+    block[0] += 1
+
+
+def run(com_port, speed, options, commands, events, block):
+    """Run a SerialSender and obey commands until "stop"."""
+    from serial_sender import SerialSender
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C is the parent's business
+    sender = SerialSender(
+        com_port, speed,
+        on_failure=lambda status="failed": events.put(("failure", status)),
+        on_reconnect=lambda: events.put(("reconnect",)),
+        log_debug=lambda message: events.put(("log", message)),
+        **options,
+    )
+    running = True
+
+    def publisher():
+        while running:
+            publish(sender, block)
+            time.sleep(PUBLISH_INTERVAL)
+
+    threading.Thread(target=publisher, daemon=True).start()
+    while True:
+        name, args = commands.get()
+        if name == "subscribe":
+            sender.subscribe(lambda reply: events.put(("reply", reply)))
+        elif name == "export":
+            sender.telemetry.export(*args)
+        else:
+            getattr(sender, name)(*args)
+        if name == "stop":
+            break
+    running = False
+    publish(sender, block)
+    events.put(("exit",))
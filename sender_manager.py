@@ -0,0 +1,242 @@
+import copy
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+
+from serial_sender import SerialSender
+from custom_coder import COMPACT_PROBE, encode_block, encode_compact, encode_frames, encode_end
+
+PROTOCOLS = ("ascii", "compact", "auto")
+
+
+def _file_name(com_port) -> str:
+    """com_port made safe for use in a file name."""
+    return re.sub(r"[^\w.-]", "_", com_port).strip("_")
+
+
+class Board:
+    """One display board: its serial link and the configuration it shows."""
+
+    def __init__(self, com_port, speed, configuration, on_failure, on_reconnect, log_debug,
+                 backend="thread", record=None, pacing="fixed"):
+        self.com_port = com_port
+        self.configuration = configuration
+        self.status = "connected"
+        self.displaying = False
+        self.countdown = False
+        self.protocol = "ascii"
+        if backend == "process":
+            from process_sender import ProcessSender  # multiprocessing only when used
+            sender_class = ProcessSender
+        else:
+            sender_class = SerialSender
+        self.sender = sender_class(
+            com_port=com_port,
+            speed=speed,
+            period=configuration.period or 0,
+            on_failure=on_failure,
+            on_reconnect=on_reconnect,
+            log_debug=log_debug,
+            backend="thread" if backend == "process" else backend,
+            record=record,
+            pacing=pacing,
+        )
+
+
+class SenderManager:
+    """Owns one SerialSender per display board.
+
+    Every board is served independently (its own threads, or its own task
+    on the shared asyncio loop with backend="asyncio"), so a slow or stalled
+    port never delays the others. backend="process" runs each board's sender
+    in a child process, out of reach of the GUI's GIL (see process_sender).
+    Methods that may block on a port (stopping it) run in a background
+    thread so the caller (the Tk thread) never waits on them.
+
+    With batch=True each board gets its whole cycle in one write per period
+    instead of one frame per period.
+
+    protocol picks the frame format per board: "ascii" (the #...... frames),
+    "compact" (one checksummed frame per update) or "auto", which probes the
+    board and switches to compact only if it acknowledges.
+
+    With record set to a directory, each board's traffic is recorded to
+    session-<port>-<time>.ventus there (see session_log).
+
+    pacing="adaptive" lets each board run as fast as its link and replies
+    allow, with the configured period as the upper bound (see pacing).
+    """
+
+    def __init__(self, on_status=None, log_debug=None, backend="thread", batch=False,
+                 protocol="ascii", record=None, pacing="fixed"):
+        self.backend = backend
+        self.batch = batch
+        self.protocol = protocol
+        self.record = record
+        self.pacing = pacing
+        self.boards: dict[str, Board] = {}
+        self.lock = threading.Lock()
+        self.log_debug = log_debug if log_debug else logging.debug
+        self.on_status = on_status if on_status else lambda: None
+
+    def __contains__(self, com_port):
+        return com_port in self.boards
+
+    def get(self, com_port) -> Board | None:
+        return self.boards.get(com_port)
+
+    def add(self, com_port, speed, configuration, protocol=None, backend=None) -> Board:
+        """Connect a board on com_port with its own configuration.
+
+        protocol and backend default to the manager's.
+        """
+        protocol = protocol or self.protocol
+        with self.lock:
+            if com_port in self.boards:
+                return self.boards[com_port]
+            board = Board(
+                com_port,
+                speed,
+                copy.copy(configuration),
+                on_failure=lambda status="failed": self._failed(com_port, status),
+                on_reconnect=lambda: self._recovered(com_port),
+                log_debug=lambda message: self.log_debug(f"[{com_port}] {message}"),
+                backend=backend or self.backend,
+                record=self._session_path(com_port),
+                pacing=self.pacing,
+            )
+            board.protocol = "ascii" if protocol == "auto" else protocol
+            self.boards[com_port] = board
+        board.sender.start()
+        if protocol == "auto":
+            board.sender.subscribe(lambda reply: self._negotiate(board, reply))
+            board.sender.send_flush(COMPACT_PROBE)
+        self.on_status()
+        return board
+
+    def remove(self, com_port) -> None:
+        """Blank and disconnect the board on com_port."""
+        with self.lock:
+            board = self.boards.pop(com_port, None)
+        if board is None:
+            return
+        if board.displaying:
+            self.finish(board)
+        threading.Thread(target=board.sender.stop, kwargs={"drain": True}, daemon=True).start()
+        self.on_status()
+
+    def remove_all(self) -> None:
+        for com_port in list(self.boards):
+            self.remove(com_port)
+
+    def display(self, com_port, configuration, countdown=False) -> bool:
+        """Start cycling configuration on one board.
+
+        Frames that differ from what the board already shows are pushed at
+        once as a burst; the periodic refresh then carries on as usual. With
+        countdown=True the board also gets a live countdown to close time.
+        """
+        board = self.boards.get(com_port)
+        if board is None:
+            return False
+        old = self._frames(board) if board.displaying else ()
+        board.configuration = copy.copy(configuration)
+        frames = self._frames(board)
+        changed = [frame for frame in frames if frame not in old]
+        board.sender.set_period(board.configuration.period)
+        if changed:
+            board.sender.log_debug("Update: " + ", ".join(f.decode().strip() for f in changed))
+            board.sender.send_update(changed)
+        board.sender.send_cycle(self._cycle(board, frames))
+        if countdown and board.configuration.close_time:
+            board.sender.start_countdown(board.configuration.close_time)
+        else:
+            board.sender.stop_countdown()
+        board.displaying = True
+        board.countdown = countdown
+        return True
+
+    def _frames(self, board) -> tuple[bytes, ...]:
+        if board.protocol == "compact":
+            return (encode_compact(board.configuration),)
+        return encode_frames(board.configuration)
+
+    def _cycle(self, board, frames) -> tuple[bytes, ...]:
+        """What the board keeps rotating: its frames, or all of them as one cached block."""
+        if self.batch and board.protocol == "ascii":
+            return (encode_block(board.configuration),)
+        return frames
+
+    def _negotiate(self, board, reply) -> None:
+        """Switch a probing board to compact frames once it acknowledges."""
+        if board.protocol == "compact" or reply["type"] != "ack" \
+                or reply["framing"] != "compact":
+            return
+        board.sender.log_debug("Board speaks compact protocol")
+        configuration = board.configuration
+        board.protocol = "compact"
+        if board.displaying:
+            board.displaying = False    # resend everything in the new format
+            self.display(board.com_port, configuration, board.countdown)
+
+    def finish(self, board_or_port) -> None:
+        """Blank one board immediately."""
+        board = board_or_port if isinstance(board_or_port, Board) \
+            else self.boards.get(board_or_port)
+        if board is None:
+            return
+        board.sender.clear_queue()
+        board.sender.send_flush(encode_end())
+        board.displaying = False
+
+    def finish_all(self) -> None:
+        for board in list(self.boards.values()):
+            self.finish(board)
+
+    def _failed(self, com_port, status="failed") -> None:
+        """status is "failed" (port error), "degraded" or "dead" (watchdog)."""
+        board = self.boards.get(com_port)
+        if board is not None:
+            board.status = status
+        self.on_status()
+
+    def set_pacing(self, mode) -> None:
+        """Switch every board (and boards added later) to "fixed" or "adaptive"."""
+        self.pacing = mode
+        for board in list(self.boards.values()):
+            board.sender.set_pacing(mode)
+
+    def _session_path(self, com_port) -> str | None:
+        if not self.record:
+            return None
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        return os.path.join(self.record, f"session-{_file_name(com_port)}-{stamp}.ventus")
+
+    def export_telemetry(self, directory, session) -> list[str]:
+        """Write each board's telemetry to <session>-<port>.jsonl in directory."""
+        paths = []
+        for port, board in list(self.boards.items()):
+            path = os.path.join(directory, f"{session}-{_file_name(port)}.jsonl")
+            board.sender.telemetry.export(path)
+            paths.append(path)
+        return paths
+
+    def _recovered(self, com_port) -> None:
+        board = self.boards.get(com_port)
+        if board is not None:
+            board.status = "connected"
+        self.on_status()
+
+    def status(self) -> dict[str, str]:
+        """Return {com_port: status} for every board."""
+        return {port: board.status for port, board in self.boards.items()}
+
+    def summary(self) -> str:
+        """Aggregate status, e.g. "Boards: 2/3 OK"."""
+        statuses = list(self.status().values())
+        if not statuses:
+            return "No boards"
+        ok = statuses.count("connected")
+        return f"Boards: {ok}/{len(statuses)} OK"
@@ -1,106 +1,357 @@
 import threading
-import queue
-import serial
-import serial.tools.list_ports
 import time
 import logging
-import sys
-import signal
+import math
+from datetime import date, datetime
 
-logging.basicConfig(level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(message)s")
+from message_scheduler import MessageScheduler
+from transport import transport_class
+from telemetry import LinkTelemetry
+from custom_coder import encode_countdown
+from reply_parser import ReplyParser
+from session_log import IN, OUT, SessionRecorder
+from pacing import AdaptivePacer
+from link_watchdog import LinkWatchdog, WatchdogThread
+
+RECONNECT_MIN = 0.5   # first reconnect delay (s), doubled on every failure
+RECONNECT_MAX = 5.0   # upper bound for the reconnect delay (s)
 
 class SerialSender:
-    def __init__(self, com_port, speed, on_failure=None, log_debug=None):
+    def __init__(self, com_port, speed, period=0, on_failure=None, log_debug=None, backend="thread",
+                 reconnect=True, on_reconnect=None, record=None, pacing="fixed", watchdog=True):
         self.com_port = com_port
         self.speed = speed
+        self.reconnect = reconnect
         self.running = False
-        self.messages = []
-        self.thread = None
+        self.link_up = False
+        self._outage = False
+        self.messages = MessageScheduler(period)
         self.ser = None
+        self.cond = threading.Condition()
+        self.transport = transport_class(backend)(self)
+        self.telemetry = LinkTelemetry()
+        self.replies = ReplyParser()
+        self._update = None
+        self.subscribers = []
+        self.record = record        # session file path, see session_log
+        self.recorder = None
+        self.pacer = None
+        self.set_pacing(pacing)
+        # watchdog: True, False or a dict of LinkWatchdog deadlines
+        self.watchdog = LinkWatchdog(self, **(watchdog if isinstance(watchdog, dict) else {})) \
+            if watchdog else None
 
         # Callbacks
         self.log_debug = log_debug if log_debug else logging.debug
-        self.on_failure = on_failure if on_failure else lambda: None
+        self.on_failure = on_failure if on_failure else lambda status="failed": None
+        self.on_reconnect = on_reconnect if on_reconnect else lambda: None
+
+    @property
+    def period(self) -> float:
+        """Seconds between paced frames right now (adaptive pacing moves it)."""
+        return self.messages.period
 
     def start(self):
-        """Start background thread."""
+        """Start serving the port in the background."""
         if self.running:
             return
         self.running = True
-        self.thread = threading.Thread(target=self._run, daemon=True)
-        self.thread.start()
+        if self.watchdog:
+            WatchdogThread.get().add(self.watchdog)
+        if self.record and self.recorder is None:
+            self.recorder = SessionRecorder(self.record)
+        self.transport.start()
         self.log_debug(f"SerialSender started on {self.com_port} at {self.speed} baud")
 
-    def stop(self):
-        """Stop background thread and close port."""
-        self.running = False
-        if self.thread:
-            self.thread.join(timeout=2)
+    def stop(self, drain=False):
+        """Stop background work and close port.
+
+        With drain=True, wait (up to a second) for pending send_flush()
+        messages to be written first.
+        """
+        if drain:
+            with self.cond:
+                self.cond.wait_for(lambda: not self.messages.priority or not self.running, timeout=1)
+        self._halt()
+        self.transport.join(timeout=2)
         if self.ser and self.ser.is_open:
             try:
                 self.ser.close()
                 self.log_debug("Serial port closed")
             except Exception as e:
                 logging.error(f"Error closing serial port: {e}")
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+
+    def set_period(self, period):
+        """Change the pacing period (seconds) of queued messages.
+
+        With adaptive pacing this is the upper bound of the period.
+        """
+        with self.cond:
+            pacer = self.pacer
+            if pacer:
+                pacer.ceiling = float(period)
+                if pacer.period is not None:
+                    pacer.period = period = min(pacer.period, pacer.ceiling)
+            self.messages.period = float(period)
+            self._changed()
+
+    def set_pacing(self, mode):
+        """"fixed" keeps the period as set; "adaptive" lets pacing.AdaptivePacer
+        pick the fastest period the link and board keep up with."""
+        with self.cond:
+            if mode == "adaptive" and self.pacer is None:
+                self.pacer = AdaptivePacer(self.speed, self.messages.period)
+            elif mode == "fixed" and self.pacer is not None:
+                self.messages.period = self.pacer.ceiling
+                self.pacer = None
+            self._changed()
 
     def send(self, message):
-        """Add a message to the list (delayed by period)."""
-        self.messages.append(message)
+        """Queue a one-shot message (delayed by period)."""
+        with self.cond:
+            self.messages.push_paced(message)
+            self._changed()
 
     def send_flush(self, message):
-        """Add a message to the list immediately (ignores pacing)."""
-        self.messages.append(message)
+        """Queue a message that goes out immediately (ignores pacing)."""
+        with self.cond:
+            self.messages.push_priority(message)
+            self._changed()
+
+    def send_cycle(self, messages):
+        """Keep rotating these messages, one per period, until replaced.
+
+        Messages may be str or pre-encoded bytes frames (CRLF included);
+        a single encode_block() frame sends the whole cycle in one write.
+        """
+        with self.cond:
+            self.messages.set_cycle(messages)
+            self._changed()
+
+    def send_update(self, frames):
+        """Push changed frames ahead of everything else, as one burst.
+
+        The time until the burst is written is logged once it is sent.
+        """
+        burst = b"".join(self._frame(frame) for frame in frames)
+        with self.cond:
+            self.messages.push_priority(burst)
+            self._update = (burst, time.monotonic())
+            self._changed()
+
+    def subscribe(self, callback):
+        """Call callback(reply) for every reply from the board.
+
+        reply is a dict from custom_coder.decode_reply: "type" is "ack",
+        "error", "status" or a compact frame type, "line" the raw text.
+        """
+        self.subscribers.append(callback)
+
+    def start_countdown(self, close_time):
+        """Send "#T mm:ss" frames counting down to close_time, once a second.
+
+        Only the time of day of close_time counts: a close time restored
+        from an older config means today. Frames are built just in time on
+        wall-clock second boundaries, mapped once onto the monotonic clock
+        so they never drift. Stops after 00:00 or on clear_queue().
+        """
+        wall, now = time.time(), time.monotonic()
+        first_wall = math.floor(wall) + 1
+        close = datetime.combine(date.today(), close_time.time()).timestamp()
+        if close < first_wall:
+            self.log_debug(f"Close time {close_time:%H:%M} has already passed, no countdown")
+            return
+
+        def frame(tick):
+            remaining = round(close - (first_wall + tick))
+            return encode_countdown(remaining) if remaining >= 0 else None
+
+        self.start_ticker(now + (first_wall - wall), 1.0, frame)
+
+    def start_ticker(self, first_due, interval, make_frame):
+        """Send make_frame(k) at monotonic first_due + k * interval until it returns None."""
+        with self.cond:
+            self.messages.set_ticker(first_due, interval, make_frame)
+            self._changed()
+
+    def stop_countdown(self):
+        with self.cond:
+            self.messages.ticker = None
 
     def clear_queue(self):
         """Clear all pending messages."""
-        self.messages.clear()
+        with self.cond:
+            self.messages.clear()
 
-    def _run(self):
-        """Worker thread: open port, send messages, and read responses."""
+    # -------------------- Transport helpers -------------------- #
+    def _changed(self):
+        """Wake whoever waits on the queue. Call with self.cond held."""
+        self.cond.notify_all()
+        self.transport.wake()
+
+    def _halt(self):
+        """Ask the transport to stop serving the port."""
+        with self.cond:
+            self.running = False
+            self._changed()
+        if self.watchdog:
+            WatchdogThread.get().remove(self.watchdog)
+
+    def _open_port(self, timeout):
+        """Open the serial port once; on failure report it and return False."""
+        import serial  # imported on first use, keeps start-up fast
         try:
-            self.ser = serial.Serial(self.com_port, self.speed, timeout=1)
+            self.ser = serial.Serial(self.com_port, self.speed, timeout=timeout)
         except Exception as e:
-            logging.error(f"Failed to open {self.com_port}: {e}")
+            self._link_lost(f"Failed to open {self.com_port}: {e}")
+            return False
+        self.replies = ReplyParser()  # drop half a line from the old link
+        if self.watchdog:
+            self.watchdog.reset()
+        with self.cond:
+            self.link_up = True
+        if self._outage:
+            self._outage = False
+            self.telemetry.reconnects += 1
+            self.log_debug(f"Reconnected to {self.com_port}")
+            self.on_reconnect()
+        return True
+
+    def _link_lost(self, message):
+        """The port failed: report it once, then retry or stop."""
+        logging.error(message)
+        if not self._outage:
+            self._outage = True
             self.on_failure()
+        if not self.reconnect:
+            self._halt()
             return
+        with self.cond:
+            self.link_up = False
+            self._changed()
+
+    def _backoff(self):
+        """Yield reconnect delays: exponential, capped at RECONNECT_MAX."""
+        delay = RECONNECT_MIN
+        while True:
+            yield delay
+            delay = min(delay * 2, RECONNECT_MAX)
+
+    def _serving(self):
+        """True while the transport should keep using the open port."""
+        return self.running and self.link_up
 
-        with self.ser:
-            last_send_time = 0
-            while self.running:
-                # --- Read incoming data ---
-                try:
-                    if self.ser.in_waiting > 0:
-                        response = self.ser.readline().decode(errors="replace").strip()
-                        if response:
-                            self.log_debug(f"Received: {response}")
-                except Exception as e:
-                    logging.error(f"Read error: {e}")
-                    self.on_failure()
-                    break
-
-                # --- Send outgoing messages ---
-                if self.messages and (time.time() - last_send_time) >= self.messages.period:
-                    msg = self.messages.pop(0)  # send one at a time
-                    try:
-                        self.ser.write(msg.encode() + b"\r\n")
-                        self.log_debug(f"Sent: {msg}")
-                    except Exception as e:
-                        logging.error(f"Serial write error: {e}")
-                        self.on_failure()
-                        break
-                    last_send_time = time.time()
-
-                time.sleep(0.05)  # prevent busy-loop
-
-            self.log_debug("SerialSender thread exited")
+    def _next_due(self):
+        """Pop the next due message as (message, 0) or return (None, wait).
+
+        Call with self.cond held.
+        """
+        now = time.monotonic()
+        msg, wait = self.messages.pop(now)
+        if msg is not None:
+            if self.watchdog:
+                self.watchdog.write_started(now)
+            self.cond.notify_all()
+        return msg, wait
+
+    def _frame(self, msg):
+        if isinstance(msg, bytes):
+            return msg
+        return msg.encode() + b"\r\n"
+
+    def _record(self, direction, data, now):
+        """Record to the session file; a recording failure stops recording, not the link."""
+        try:
+            self.recorder.record(direction, data, now)
+        except Exception as e:
+            logging.error(f"Session recording stopped: {e}")
+            recorder, self.recorder = self.recorder, None
+            try:
+                recorder.close()
+            except Exception:
+                pass
+
+    def _sent(self, msg, write_start, nbytes):
+        """Record and log a frame the transport finished writing."""
+        now = time.monotonic()
+        if self.recorder:
+            self._record(OUT, self._frame(msg), write_start)
+        if self.pacer:
+            self._pace("frame_sent", nbytes, now)
+        if self.watchdog:
+            self.watchdog.write_done(now)
+        self.telemetry.frame_written(self.messages.enqueued, write_start, now, nbytes)
+        self.telemetry.queue_drops = self.messages.dropped
+        if self._update and self._update[0] is msg:
+            elapsed = now - self._update[1]
+            self._update = None
+            self.log_debug(f"Update on the wire after {elapsed * 1000:.1f} ms")
+        if isinstance(msg, bytes):
+            msg = msg.decode(errors="replace").strip().replace("\r\n", " | ")
+        self.log_debug(f"Sent: {msg}")
+
+    def _received(self, data):
+        """Parse data and hand every complete reply to the subscribers."""
+        now = time.monotonic()
+        if self.recorder and data:
+            self._record(IN, data, now)
+        for reply in self.replies.feed(data):
+            self.telemetry.reply_received(now)
+            if self.pacer:
+                self._pace("reply", now)
+            if self.watchdog:
+                self.watchdog.reply(now)
+            self.log_debug(f"Received: {reply['line']}")
+            for callback in self.subscribers:
+                callback(reply)
+
+    def _heartbeat(self):
+        """Resend the next cyclic frame now, to get a reply from the board."""
+        with self.cond:
+            if self.messages.cyclic:
+                self.messages.push_priority(self.messages.cyclic[0])
+                self._changed()
+
+    def _pace(self, event, *args):
+        """Pass event to the adaptive pacer, if still on, and apply its period."""
+        with self.cond:
+            if self.pacer is None:
+                return
+            backoffs = self.pacer.backoffs
+            getattr(self.pacer, event)(*args)
+            period = self.pacer.period
+            if period is not None and period != self.messages.period:
+                if period < self.messages.period:
+                    self._changed()     # the writer may be waiting on the old slot
+                self.messages.period = period
+            backed_off = self.pacer.backoffs != backoffs
+        if backed_off:
+            self.log_debug(f"Backing off, period now {self.messages.period * 1000:.0f} ms")
+
+    def _fail(self, kind, error, msg=None):
+        """Report a "read" or "write" error; the link reconnects or stops.
+
+        msg is the frame whose write failed; it goes out first once the
+        port is back, so the cycle resumes where it stopped.
+        """
+        if kind == "read":
+            self.telemetry.read_errors += 1
+            what = "Read error"
+        else:
+            self.telemetry.write_errors += 1
+            what = "Serial write error"
+            if msg is not None:
+                with self.cond:
+                    self.messages.requeue(msg)
+        if self.pacer:
+            self._pace("back_off")
+        self._link_lost(f"{what}: {error}")
 
     @staticmethod
     def list_ports():
         """Helper to list available COM ports."""
-        return serial.tools.list_ports.comports()
-
-def _handle_sigint(sig, frame):
-    logging.info("Interrupted, exiting...")
-    sys.exit(0)
-
-signal.signal(signal.SIGINT, _handle_sigint)
\ No newline at end of file
+        from serial.tools import list_ports
+        return list_ports.comports()
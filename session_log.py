@@ -0,0 +1,169 @@
+"""
+Binary session files: every frame a SerialSender wrote and every chunk it
+read, with monotonic timestamps, so field problems can be replayed later.
+
+File layout (little endian):
+
+    header  "VNTS", version (u8), wall-clock start (f64)
+    record  seconds since start (f64), direction (u8), length (u32), bytes
+
+Version 1 files (u16 lengths) are still read.
+
+Replay a session into a fresh pty (or a real port with --device):
+
+    python session_log.py session-COM3-20250830-101500.ventus --speed 10
+    python session_log.py session.ventus --list
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+
+MAGIC = b"VNTS"
+VERSION = 2
+HEADER = struct.Struct("<4sBd")
+RECORD = struct.Struct("<dBI")
+RECORDS = {1: struct.Struct("<dBH"), VERSION: RECORD}
+
+OUT = 0   # written to the board
+IN = 1    # read from the board
+
+FLUSH_INTERVAL = 1.0  # seconds between flushes while recording
+
+
+class SessionRecorder:
+    """Append frames to a session file; safe to call from several threads."""
+
+    def __init__(self, path):
+        self.path = path
+        self.origin = time.monotonic()
+        self.file = open(path, "wb", buffering=65536)
+        self.file.write(HEADER.pack(MAGIC, VERSION, time.time()))
+        self.file.flush()
+        self.lock = threading.Lock()
+        self.records = 0
+        self._flushed = self.origin
+
+    def record(self, direction, data, now=None) -> None:
+        """Record data sent (OUT) or received (IN) at monotonic time now."""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.write(RECORD.pack(now - self.origin, direction, len(data)))
+            self.file.write(data)
+            self.records += 1
+            if now - self._flushed >= FLUSH_INTERVAL:
+                self.file.flush()
+                self._flushed = now
+
+    def close(self) -> None:
+        with self.lock:
+            self.file.close()
+
+
+class SessionReader:
+    """Memory-mapped view of a session file.
+
+    Iterating yields (seconds, direction, payload); only the pages a record
+    lives on are read, so long sessions open instantly. A record cut short
+    by a crash ends the iteration; a file whose header never reached the
+    disk has no records and ``started`` None.
+    """
+
+    def __init__(self, path):
+        self.map = None
+        self.started = None
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                return
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.started = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version not in RECORDS:
+            self.map.close()
+            raise ValueError(f"{path} is not a session file")
+        self.record = RECORDS[version]
+
+    def __iter__(self):
+        if self.map is None:
+            return
+        record = self.record
+        offset, size = HEADER.size, len(self.map)
+        while offset + record.size <= size:
+            seconds, direction, length = record.unpack_from(self.map, offset)
+            offset += record.size
+            if offset + length > size:
+                return
+            yield seconds, direction, self.map[offset:offset + length]
+            offset += length
+
+    def close(self) -> None:
+        if self.map is not None:
+            self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def replay(path, write, speed=1.0, direction=OUT) -> int:
+    """Call write(bytes) for every record in direction, keeping the original
+    spacing divided by speed (0 = as fast as possible). Returns the count."""
+    count = 0
+    with SessionReader(path) as session:
+        start = time.monotonic()
+        for seconds, record_direction, payload in session:
+            if record_direction != direction:
+                continue
+            if speed:
+                delay = start + seconds / speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            write(payload)
+            count += 1
+    return count
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Replay a recorded serial session")
+    parser.add_argument("session")
+    parser.add_argument("--device", help="write to this serial port instead of a new pty")
+    parser.add_argument("--baud", type=int, default=9600)
+    parser.add_argument("--speed", type=float, default=1.0, help="time scale, 0 = no pauses")
+    parser.add_argument("--incoming", action="store_true",
+                        help="replay what the board sent instead of what it received")
+    parser.add_argument("--list", action="store_true", help="print the records and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        with SessionReader(args.session) as session:
+            if session.started is None:
+                print("Empty session: nothing was recorded")
+                return
+            print(f"Recorded {time.ctime(session.started)}")
+            for seconds, direction, payload in session:
+                print(f"{seconds:12.6f} {'<-' if direction == IN else '->'} {payload!r}")
+        return
+
+    if args.device:
+        import serial
+        port = serial.Serial(args.device, args.baud)
+        write = port.write
+    else:
+        from pty_port import PtyPort
+        port = PtyPort()
+        write = port.write
+        input(f"Replaying into {port.device}; open it, then press Enter ")
+    try:
+        count = replay(args.session, write, args.speed, IN if args.incoming else OUT)
+        print(f"Replayed {count} records")
+    finally:
+        port.close()
+
+
+if __name__ == "__main__":
+    main()
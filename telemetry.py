@@ -0,0 +1,97 @@
+import csv
+import json
+import time
+from collections import deque
+
+FIELDS = ["enqueued", "write_start", "write_end", "bytes", "reply"]
+
+
+class LinkTelemetry:
+    """Per-frame timing and error counters for one serial link.
+
+    Every written frame is kept as a small list
+    [enqueued, write_start, write_end, bytes, reply] (monotonic seconds; reply
+    is None until the board answers) in a bounded deque, and running totals
+    are updated on the fly so summary() never scans the records. Recording
+    costs a few list/deque operations per frame, cheap enough to leave on.
+    """
+
+    def __init__(self, size=10000):
+        self.records = deque(maxlen=size)
+        self.started = time.time()
+        self._awaiting_reply = None
+
+        # Counters
+        self.frames = 0
+        self.bytes = 0
+        self.replies = 0
+        self.write_errors = 0
+        self.read_errors = 0
+        self.reconnects = 0
+        self.queue_drops = 0
+
+        # Running totals (seconds)
+        self.write_time = 0.0
+        self.write_time_max = 0.0
+        self.queue_time = 0.0
+        self.reply_time = 0.0
+
+    def frame_written(self, enqueued, write_start, write_end, nbytes):
+        record = [enqueued, write_start, write_end, nbytes, None]
+        self.records.append(record)
+        self._awaiting_reply = record
+        self.frames += 1
+        self.bytes += nbytes
+        duration = write_end - write_start
+        self.write_time += duration
+        if duration > self.write_time_max:
+            self.write_time_max = duration
+        if enqueued is not None:
+            self.queue_time += write_start - enqueued
+
+    def reply_received(self, now):
+        """Attribute a board reply to the last frame still waiting for one."""
+        record = self._awaiting_reply
+        if record is None:
+            return
+        self._awaiting_reply = None
+        record[4] = now
+        self.replies += 1
+        self.reply_time += now - record[2]
+
+    def summary(self) -> dict:
+        frames = self.frames or 1
+        return {
+            "frames": self.frames,
+            "bytes": self.bytes,
+            "write_ms": self.write_time / frames * 1000,
+            "write_max_ms": self.write_time_max * 1000,
+            "queue_ms": self.queue_time / frames * 1000,
+            "reply_ms": self.reply_time / self.replies * 1000 if self.replies else None,
+            "replies": self.replies,
+            "write_errors": self.write_errors,
+            "read_errors": self.read_errors,
+            "reconnects": self.reconnects,
+            "queue_drops": self.queue_drops,
+        }
+
+    def summary_line(self) -> str:
+        """Compact one-line view for the GUI stats panel."""
+        s = self.summary()
+        reply = f"{s['reply_ms']:.0f} ms" if s["reply_ms"] is not None else "-"
+        return (f"{s['frames']} frames, write {s['write_ms']:.1f}/{s['write_max_ms']:.1f} ms, "
+                f"reply {reply}, errors w{s['write_errors']} r{s['read_errors']}, "
+                f"reconnects {s['reconnects']}, drops {s['queue_drops']}")
+
+    def export(self, path) -> None:
+        """Write the session's frame records to a .csv or .jsonl file."""
+        records = list(self.records)
+        with open(path, "w", newline="") as f:
+            if str(path).endswith(".jsonl"):
+                f.write(json.dumps({"session_start": self.started, **self.summary()}) + "\n")
+                for record in records:
+                    f.write(json.dumps(dict(zip(FIELDS, record))) + "\n")
+            else:
+                writer = csv.writer(f)
+                writer.writerow(FIELDS)
+                writer.writerows(records)
@@ -0,0 +1,36 @@
+import unittest
+
+from configuration import Configuration
+from custom_coder import COMPACT_ACK, COMPACT_PROBE, decode_compact, encode_compact
+from tests.test_custom_coder import configuration
+
+
+class CompactProtocolTest(unittest.TestCase):
+
+    def test_compact_round_trip(self):
+        frame = encode_compact(configuration())
+        self.assertTrue(frame.startswith(b"$") and frame.endswith(b"\r\n"))
+        self.assertEqual(decode_compact(frame), {
+            "type": "update", "series": "07", "group": "B",
+            "open": "10:00", "close": "10:15", "direction": "RIGHT",
+        })
+
+    def test_compact_without_times_or_direction(self):
+        config = Configuration()
+        config.series, config.group = "3", "A"
+        reply = decode_compact(encode_compact(config))
+        self.assertEqual((reply["open"], reply["close"], reply["direction"]), (None, None, None))
+
+    def test_compact_bad_checksum_is_rejected(self):
+        frame = bytearray(encode_compact(configuration()))
+        frame[3] ^= 1
+        self.assertIsNone(decode_compact(bytes(frame)))
+        self.assertIsNone(decode_compact("#C 10:15"))
+
+    def test_probe_and_ack(self):
+        self.assertEqual(decode_compact(COMPACT_PROBE), {"type": "probe"})
+        self.assertEqual(decode_compact(COMPACT_ACK), {"type": "ack"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+import unittest
+
+from config_store import get_history_path, last_lines, load_config, write_atomic
+
+
+class ConfigStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "config.json")
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_write_atomic_replaces_and_leaves_no_temp_file(self):
+        write_atomic(self.path, "old")
+        write_atomic(self.path, "new")
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "new")
+        self.assertEqual(os.listdir(self.folder.name), ["config.json"])
+
+    def test_write_atomic_failure_keeps_the_old_file(self):
+        write_atomic(self.path, "old")
+        with self.assertRaises(TypeError):
+            write_atomic(self.path, None)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "old")
+        self.assertEqual(os.listdir(self.folder.name), ["config.json"])
+
+    def test_last_lines_reads_backwards_across_blocks(self):
+        lines = [f"line {i}" for i in range(50)]
+        with open(self.path, "w") as f:
+            f.write("\n".join(lines) + "\n\n")
+        self.assertEqual(list(last_lines(self.path, block=7)), lines[::-1])
+
+    def test_last_lines_of_a_missing_file(self):
+        self.assertEqual(list(last_lines(self.path)), [])
+
+    def test_torn_history_line_falls_back_to_the_one_before(self):
+        with open(get_history_path(self.path), "w") as f:
+            f.write(json.dumps({"series": "06", "group": "A"}) + "\n")
+            f.write('{"series": "07", "gro')
+        config = load_config(self.path)
+        self.assertEqual((config.series, config.group), ("06", "A"))
+
+    def test_damaged_config_falls_back_to_history(self):
+        with open(self.path, "w") as f:
+            f.write("{nope")
+        with open(get_history_path(self.path), "w") as f:
+            f.write(json.dumps({"series": "08", "group": "B"}) + "\n")
+        self.assertEqual(load_config(self.path).series, "08")
+
+
+if __name__ == "__main__":
+    unittest.main()
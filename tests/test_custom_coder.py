@@ -0,0 +1,39 @@
+import unittest
+from datetime import datetime
+
+from configuration import Configuration
+from custom_coder import encode_block, encode_countdown, encode_frames, encode_message
+
+
+def configuration(series="7", group="B", a_right=False):
+    config = Configuration()
+    config.series = series
+    config.group = group
+    config.open_time = datetime(2025, 8, 30, 10, 0)
+    config.close_time = datetime(2025, 8, 30, 10, 15)
+    config.period = "5"
+    config.a_right = a_right
+    return config
+
+
+class CustomCoderTest(unittest.TestCase):
+
+    def test_frames_are_messages_with_crlf_and_cached(self):
+        config = configuration()
+        frames = encode_frames(config)
+        self.assertEqual(frames, tuple(m.encode() + b"\r\n" for m in encode_message(config)))
+        self.assertIs(encode_frames(configuration()), frames)
+
+    def test_block_joins_frames_and_is_cached(self):
+        block = encode_block(configuration())
+        self.assertEqual(block, b"".join(encode_frames(configuration())))
+        self.assertIs(encode_block(configuration()), block)
+
+    def test_countdown_is_capped(self):
+        self.assertEqual(encode_countdown(90), "#T 01:30")
+        self.assertEqual(encode_countdown(-5), "#T 00:00")
+        self.assertEqual(encode_countdown(10 ** 6), "#T 99:59")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import json
+import threading
+import unittest
+import urllib.error
+import urllib.request
+
+import daemon
+
+CONFIG = {"series": "06", "group": "A", "open_time": "11:35", "close_time": "11:50",
+          "period": "5", "a_right": True}
+
+
+class FakeManager:
+    """Records what the controller applies instead of driving serial links."""
+
+    def __init__(self, ports):
+        self.boards = {port: None for port in ports}
+        self.calls = []
+
+    def display(self, port, configuration, countdown=False):
+        self.calls.append(("display", port, configuration.series))
+
+    def finish(self, port):
+        self.calls.append(("finish", port))
+
+
+class ControllerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = FakeManager(["COM3", "COM4"])
+        self.controller = daemon.Controller(self.manager, coalesce=0)
+        self.controller.stop()      # drive _apply() by hand
+
+    def test_burst_is_coalesced_to_the_latest_state(self):
+        self.controller.set_configuration(CONFIG)
+        self.controller.display()
+        for series in range(10):
+            self.controller.set_configuration({"series": series})
+        self.controller._apply()
+        self.assertEqual(sorted(self.manager.calls), [("display", "COM3", "9"), ("display", "COM4", "9")])
+        self.assertEqual(self.controller.requests, 12)
+        self.controller._apply()
+        self.assertEqual(len(self.manager.calls), 2)    # nothing changed since
+
+    def test_port_configuration_stays_on_that_port(self):
+        self.controller.set_configuration(CONFIG)
+        self.controller.set_configuration({"series": "07"}, port="COM3")
+        self.controller.display()
+        self.controller._apply()
+        self.assertEqual(sorted(self.manager.calls), [("display", "COM3", "07"), ("display", "COM4", "06")])
+        self.assertEqual(self.controller.configuration.series, "06")
+
+    def test_incomplete_configuration_is_not_displayed(self):
+        self.controller.set_configuration({"series": "06"})
+        self.assertFalse(self.controller.display())
+        self.controller._apply()
+        self.assertEqual(self.manager.calls, [])
+
+    def test_finish_blanks(self):
+        self.controller.set_configuration(CONFIG)
+        self.controller.display("COM4")
+        self.controller._apply()
+        self.controller.finish("COM4")
+        self.controller._apply()
+        self.assertEqual(self.manager.calls, [("display", "COM4", "06"), ("finish", "COM4")])
+
+
+class HandlerTest(unittest.TestCase):
+
+    def setUp(self):
+        controller = daemon.Controller(FakeManager(["COM3"]), coalesce=0)
+        controller.stop()
+        self.server = daemon.make_server(controller, port=0)
+        threading.Thread(target=self.server.serve_forever, args=(0.01,), daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def post(self, path, body: bytes):
+        try:
+            with urllib.request.urlopen(urllib.request.Request(self.url + path, data=body)) as reply:
+                return reply.status, json.loads(reply.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def test_body_must_be_an_object(self):
+        for body in (b"[1]", b'"x"', b"3"):
+            self.assertEqual(self.post("/finish", body)[0], 400)
+
+    def test_bad_json_is_400(self):
+        self.assertEqual(self.post("/finish", b"{nope")[0], 400)
+
+    def test_unknown_port_and_path_are_404(self):
+        self.assertEqual(self.post("/finish", b'{"port": "COM9"}')[0], 404)
+        self.assertEqual(self.post("/nowhere", b"{}")[0], 404)
+
+    def test_known_port_is_accepted(self):
+        self.assertEqual(self.post("/finish", b'{"port": "COM3"}'), (200, {"ok": True}))
+
+
+class LoopbackTest(unittest.TestCase):
+
+    def test_loopback_hosts(self):
+        self.assertTrue(daemon._is_loopback("127.0.0.1"))
+        self.assertTrue(daemon._is_loopback("::1"))
+        self.assertTrue(daemon._is_loopback("localhost"))
+        self.assertFalse(daemon._is_loopback("0.0.0.0"))
+        self.assertFalse(daemon._is_loopback(""))
+        self.assertFalse(daemon._is_loopback("192.168.1.5"))
+
+
+if __name__ == "__main__":
+    unittest.main()
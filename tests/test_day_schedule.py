@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from configuration import Configuration
+from day_schedule import END, START, DaySchedule, Round, load_rounds
+
+
+def running_round(series):
+    """A round that started an hour ago and ends in an hour."""
+    config = Configuration()
+    config.series = series
+    now = datetime.now()
+    return Round(config, now - timedelta(hours=1), now + timedelta(hours=1))
+
+
+def live_events(schedule):
+    """Heap events that still belong to the current version of their round."""
+    return sorted((kind, round_id) for _, kind, _, round_id, version in schedule.heap
+                  if round_id in schedule.rounds and schedule.rounds[round_id].version == version)
+
+
+class DayScheduleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.fired = []
+        self.schedule = DaySchedule(
+            on_start=lambda config: self.fired.append(("start", config.series)),
+            on_end=lambda round_: self.fired.append(("end", round_.configuration.series)),
+        )
+        self.schedule.running = True    # drive _next_event() directly, no thread
+
+    def test_update_leaves_only_new_events(self):
+        round_id = self.schedule.add(running_round("01"))
+        self.schedule.update(round_id, running_round("02"))
+        self.assertEqual(live_events(self.schedule), [(END, round_id), (START, round_id)])
+        kind, event_id, round_ = self.schedule._next_event()
+        self.assertEqual((kind, event_id, round_.configuration.series), (START, round_id, "02"))
+
+    def test_removed_then_readded_id_does_not_revive_stale_events(self):
+        round_id = self.schedule.add(running_round("01"))
+        self.schedule.remove(round_id)
+        self.schedule.update(round_id, running_round("02"))
+        self.assertEqual(live_events(self.schedule), [(END, round_id), (START, round_id)])
+
+    def test_versions_only_increase(self):
+        first = running_round("01")
+        round_id = self.schedule.add(first)
+        self.schedule.remove(round_id)
+        second = running_round("02")
+        self.schedule.update(round_id, second)
+        self.assertGreater(second.version, first.version)
+
+    def test_overlapping_round_is_not_blanked_by_the_earlier_end(self):
+        first, second = running_round("01"), running_round("02")
+        first_id, second_id = self.schedule.add(first), self.schedule.add(second)
+        for event in [(START, first_id, first), (START, second_id, second),
+                      (END, first_id, first), (END, second_id, second)]:
+            self.schedule._fire(*event)
+        self.assertEqual(self.fired, [("start", "01"), ("start", "02"), ("end", "02")])
+
+    def test_finished_round_is_not_queued(self):
+        config = Configuration()
+        now = datetime.now()
+        self.schedule.add(Round(config, now - timedelta(hours=2), now - timedelta(hours=1)))
+        self.assertEqual(self.schedule.heap, [])
+
+    def test_load_rounds_defaults_start_and_end(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "day.csv")
+            with open(path, "w") as f:
+                f.write("series,group,open,close,a_right,start\n"
+                        "6,a,11:35,11:50,true,\n"
+                        "06,B,11:50,12:05,no,11:45:30\n")
+            day = datetime(2025, 8, 30)
+            first, second = load_rounds(path, day, period="3")
+        self.assertEqual((first.configuration.series, first.configuration.group), ("06", "A"))
+        self.assertEqual((first.start, first.end), (day.replace(hour=11, minute=35),
+                                                    day.replace(hour=11, minute=50)))
+        self.assertEqual(second.start, day.replace(hour=11, minute=45, second=30))
+        self.assertIs(second.configuration.a_right, False)
+        self.assertEqual(second.configuration.period, "3")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+
+from link_watchdog import TRUST, LinkWatchdog
+
+
+class FakeSender:
+    """Records what the watchdog reports; no thread, check() is called by hand."""
+
+    def __init__(self):
+        self.events = []
+
+    def _serving(self):
+        return True
+
+    def log_debug(self, message):
+        pass
+
+    def on_failure(self, status):
+        self.events.append(status)
+
+    def on_reconnect(self):
+        self.events.append("reconnect")
+
+    def _heartbeat(self):
+        self.events.append("heartbeat")
+
+
+class LinkWatchdogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sender = FakeSender()
+        self.watchdog = LinkWatchdog(self.sender, reply_timeout=0.5, dead_timeout=2.0, write_timeout=1.0)
+
+    def send(self, now, answered=True):
+        self.watchdog.write_started(now)
+        self.watchdog.write_done(now + 0.01)
+        if answered:
+            self.watchdog.reply(now + 0.02)
+
+    def test_answering_board_goes_degraded_then_dead_then_back(self):
+        for i in range(TRUST):
+            self.send(i)
+        self.assertTrue(self.watchdog.answering)
+        self.send(10, answered=False)
+        self.watchdog.check(10.3)
+        self.assertEqual(self.watchdog.status, "ok")
+        self.watchdog.check(10.6)
+        self.assertEqual(self.watchdog.status, "degraded")
+        self.watchdog.check(10.7)
+        self.watchdog.check(12.1)
+        self.assertEqual(self.watchdog.status, "dead")
+        self.watchdog.check(20)
+        self.watchdog.reply(20.5)
+        self.assertEqual(self.watchdog.status, "ok")
+        self.assertEqual(self.sender.events, ["degraded", "dead", "reconnect"])
+
+    def test_silent_board_is_never_degraded(self):
+        for i in range(10):
+            self.send(i, answered=False)
+        self.watchdog.check(100)
+        self.assertFalse(self.watchdog.answering)
+        self.assertEqual((self.watchdog.status, self.sender.events), ("ok", []))
+
+    def test_stalled_write_is_dead_until_a_write_completes(self):
+        self.watchdog.write_started(0)
+        self.watchdog.check(0.9)
+        self.assertEqual(self.watchdog.status, "ok")
+        self.watchdog.check(1.1)
+        self.assertEqual(self.watchdog.status, "dead")
+        self.watchdog.write_done(5)
+        self.assertEqual(self.watchdog.status, "ok")
+        self.assertEqual(self.sender.events, ["dead", "reconnect"])
+
+    def test_heartbeat_after_an_idle_period(self):
+        self.watchdog.heartbeat = 1.0
+        self.send(0, answered=False)
+        self.watchdog.check(0.5)
+        self.watchdog.check(1.5)
+        self.watchdog.check(2.0)
+        self.assertEqual(self.sender.events, ["heartbeat"])
+        self.assertEqual(self.watchdog.next_deadline(), 2.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
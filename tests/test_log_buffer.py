@@ -0,0 +1,28 @@
+import unittest
+
+from log_buffer import LogBuffer
+
+
+class LogBufferTest(unittest.TestCase):
+
+    def test_drain_returns_lines_in_order(self):
+        buffer = LogBuffer()
+        for line in ("a", "b", "c"):
+            buffer.append(line)
+        self.assertEqual(buffer.drain(), ["a", "b", "c"])
+        self.assertEqual(buffer.drain(), [])
+        self.assertEqual(buffer.dropped, 0)
+
+    def test_overwritten_lines_are_counted(self):
+        buffer = LogBuffer(size=3)
+        for i in range(5):
+            buffer.append(str(i))
+        self.assertEqual(buffer.drain(), ["2", "3", "4"])
+        self.assertEqual(buffer.dropped, 2)
+        buffer.append("5")
+        self.assertEqual(buffer.drain(), ["5"])
+        self.assertEqual(buffer.dropped, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
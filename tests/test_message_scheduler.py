@@ -0,0 +1,86 @@
+import unittest
+
+from message_scheduler import MessageScheduler
+
+
+def drain(scheduler, now):
+    """Pop everything due at now."""
+    out = []
+    while (message := scheduler.pop(now)[0]) is not None:
+        out.append(message)
+    return out
+
+
+class MessageSchedulerTest(unittest.TestCase):
+
+    def test_priority_goes_first_and_keeps_repeats(self):
+        scheduler = MessageScheduler(period=1)
+        scheduler.set_cycle(["a", "b"])
+        for _ in range(3):
+            scheduler.push_priority("end")
+        self.assertEqual(drain(scheduler, 0), ["end", "end", "end", "a"])
+
+    def test_paced_repeat_of_tail_is_coalesced(self):
+        scheduler = MessageScheduler(period=1)
+        scheduler.push_paced("x")
+        scheduler.push_paced("x")
+        scheduler.push_paced("y")
+        self.assertEqual(len(scheduler.paced), 2)
+        self.assertEqual(scheduler.coalesced, 1)
+
+    def test_paced_before_cyclic_one_per_period(self):
+        scheduler = MessageScheduler(period=1)
+        scheduler.set_cycle(["a", "b"])
+        scheduler.push_paced("p")
+        self.assertEqual(scheduler.pop(0), ("p", 0))
+        self.assertEqual(scheduler.pop(0.25), (None, 0.75))
+        self.assertEqual(scheduler.pop(1)[0], "a")
+        self.assertEqual(scheduler.pop(2)[0], "b")
+        self.assertEqual(scheduler.pop(3)[0], "a")
+
+    def test_same_cycle_keeps_rotation(self):
+        scheduler = MessageScheduler(period=0)
+        scheduler.set_cycle(["a", "b", "c"])
+        scheduler.pop(0)
+        scheduler.set_cycle(["c", "a", "b"])
+        self.assertEqual(scheduler.coalesced, 1)
+        self.assertEqual(scheduler.pop(1)[0], "b")
+
+    def test_full_lane_drops_oldest(self):
+        scheduler = MessageScheduler(period=0, max_size=2)
+        for message in "abc":
+            scheduler.push_paced(message)
+        self.assertEqual(scheduler.dropped, 1)
+        self.assertEqual(drain(scheduler, 0)[:1], ["b"])
+
+    def test_ticker_skips_missed_ticks_and_ends(self):
+        scheduler = MessageScheduler(period=10)
+        scheduler.set_ticker(100, 1, lambda k: f"#T {k}" if k < 5 else None)
+        self.assertEqual(scheduler.pop(99.5), (None, 0.5))
+        self.assertEqual(scheduler.pop(100)[0], "#T 0")
+        self.assertEqual(scheduler.pop(103.2)[0], "#T 3")
+        self.assertEqual(scheduler.enqueued, 103)
+        self.assertEqual(scheduler.pop(104)[0], "#T 4")
+        self.assertEqual(scheduler.pop(105), (None, None))
+        self.assertIsNone(scheduler.ticker)
+
+    def test_requeue_puts_failed_frame_first(self):
+        scheduler = MessageScheduler(period=1)
+        scheduler.set_cycle(["a", "b"])
+        message, _ = scheduler.pop(0)
+        scheduler.requeue(message)
+        self.assertEqual(scheduler.pop(0)[0], "a")
+
+    def test_clear_empties_every_lane(self):
+        scheduler = MessageScheduler(period=1)
+        scheduler.push_priority("x")
+        scheduler.push_paced("y")
+        scheduler.set_cycle(["z"])
+        scheduler.set_ticker(0, 1, str)
+        scheduler.clear()
+        self.assertEqual(len(scheduler), 0)
+        self.assertEqual(scheduler.pop(0), (None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
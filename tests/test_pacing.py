@@ -0,0 +1,57 @@
+import unittest
+
+from pacing import LAG_FRAMES, MIN_PERIOD, REPLY_MARGIN, AdaptivePacer
+
+
+def settle(pacer, frames, reply_after=0.001, nbytes=10):
+    """Send frames that are each answered reply_after seconds later."""
+    now = 0.0
+    for _ in range(frames):
+        pacer.frame_sent(nbytes, now)
+        pacer.reply(now + reply_after)
+        now += 1
+    return pacer.period
+
+
+class AdaptivePacerTest(unittest.TestCase):
+
+    def test_silent_board_keeps_operator_period(self):
+        pacer = AdaptivePacer(9600, ceiling=5.0)
+        for i in range(10):
+            self.assertEqual(pacer.frame_sent(40, i), 5.0)
+
+    def test_first_reply_tightens_to_target(self):
+        pacer = AdaptivePacer(115200, ceiling=5.0)
+        pacer.frame_sent(10, 0.0)
+        pacer.reply(0.1)
+        self.assertAlmostEqual(pacer.period, 0.1 * REPLY_MARGIN)
+
+    def test_fast_board_hits_the_floor(self):
+        self.assertEqual(settle(AdaptivePacer(115200, ceiling=5.0), 5), MIN_PERIOD)
+
+    def test_wire_time_bounds_the_period(self):
+        pacer = AdaptivePacer(9600, ceiling=5.0)
+        settle(pacer, 5, nbytes=100)
+        self.assertGreaterEqual(pacer.period, 100 * 10 / 9600)
+
+    def test_never_above_ceiling(self):
+        self.assertEqual(settle(AdaptivePacer(115200, ceiling=0.05), 5, reply_after=1.0), 0.05)
+
+    def test_back_off_doubles_and_recovers(self):
+        pacer = AdaptivePacer(115200, ceiling=5.0)
+        settled = settle(pacer, 50)
+        self.assertEqual(pacer.back_off(), 2 * settled)
+        self.assertEqual(settle(pacer, 50), settled)
+        self.assertEqual(pacer.backoffs, 1)
+
+    def test_lagging_board_backs_off(self):
+        pacer = AdaptivePacer(115200, ceiling=5.0)
+        settled = settle(pacer, 5)
+        for i in range(LAG_FRAMES + 1):
+            pacer.frame_sent(10, 100 + i)
+        self.assertEqual(pacer.backoffs, 1)
+        self.assertEqual(pacer.period, 2 * settled)
+
+
+if __name__ == "__main__":
+    unittest.main()
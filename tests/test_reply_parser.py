@@ -0,0 +1,47 @@
+import unittest
+
+from custom_coder import COMPACT_ACK, decode_reply
+from reply_parser import ReplyParser
+
+
+class ReplyParserTest(unittest.TestCase):
+
+    def test_lines_split_across_feeds(self):
+        parser = ReplyParser()
+        self.assertEqual(parser.feed(b"O"), [])
+        self.assertEqual(parser.pending(), 1)
+        replies = parser.feed(b"K\r\nERR 2\r\nTEM")
+        self.assertEqual([r["line"] for r in replies], ["OK", "ERR 2"])
+        self.assertEqual(parser.pending(), 3)
+        self.assertEqual(parser.feed(b"P 21\n")[0]["type"], "status")
+        self.assertEqual(parser.pending(), 0)
+
+    def test_empty_lines_are_skipped(self):
+        self.assertEqual(ReplyParser().feed(b"\r\n\r\n"), [])
+
+    def test_buffer_wraps_without_losing_lines(self):
+        parser = ReplyParser(capacity=16)
+        lines = []
+        for _ in range(20):
+            lines += parser.feed(b"OK\r\nERR")
+            lines += parser.feed(b" 1\r\n")
+        self.assertEqual([r["line"] for r in lines], ["OK", "ERR 1"] * 20)
+        self.assertEqual(parser.overflows, 0)
+
+    def test_overlong_line_is_dropped(self):
+        parser = ReplyParser(capacity=8)
+        replies = parser.feed(b"X" * 20 + b"\nOK\n")
+        self.assertEqual([r["line"] for r in replies], ["OK"])
+        self.assertEqual(parser.overflows, 1)
+
+    def test_decode_reply_classifies_lines(self):
+        self.assertIsNone(decode_reply("  "))
+        self.assertEqual(decode_reply("ok")["type"], "ack")
+        self.assertEqual(decode_reply("ERR 3 bad frame")["detail"], "3 bad frame")
+        self.assertEqual(decode_reply("TEMP 21")["type"], "status")
+        self.assertEqual(decode_reply(COMPACT_ACK.decode())["framing"], "compact")
+        self.assertEqual(decode_reply("$OK*00")["type"], "error")
+
+
+if __name__ == "__main__":
+    unittest.main()
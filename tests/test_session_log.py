@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+
+from session_log import HEADER, IN, MAGIC, OUT, RECORDS, SessionReader, SessionRecorder, replay
+
+
+class SessionLogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "session.ventus")
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def read(self):
+        with SessionReader(self.path) as session:
+            return [(round(seconds, 6), direction, bytes(payload)) for seconds, direction, payload in session]
+
+    def test_recorded_frames_read_back(self):
+        recorder = SessionRecorder(self.path)
+        recorder.record(OUT, b"#S06A\r\n", now=recorder.origin + 0.5)
+        recorder.record(IN, b"OK\r\n", now=recorder.origin + 0.75)
+        recorder.record(OUT, b"x" * 70000, now=recorder.origin + 1)   # beyond a u16 length
+        recorder.close()
+        recorder.record(OUT, b"late")                                   # ignored once closed
+        self.assertEqual(self.read(), [(0.5, OUT, b"#S06A\r\n"), (0.75, IN, b"OK\r\n"),
+                                       (1.0, OUT, b"x" * 70000)])
+
+    def test_version_1_file_is_read(self):
+        with open(self.path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, 1, 0.0))
+            f.write(RECORDS[1].pack(0.25, OUT, 3) + b"abc")
+        self.assertEqual(self.read(), [(0.25, OUT, b"abc")])
+
+    def test_truncated_record_ends_the_session(self):
+        recorder = SessionRecorder(self.path)
+        recorder.record(OUT, b"first", now=recorder.origin)
+        recorder.record(OUT, b"second", now=recorder.origin)
+        recorder.close()
+        with open(self.path, "r+b") as f:
+            f.truncate(os.path.getsize(self.path) - 2)
+        self.assertEqual(self.read(), [(0.0, OUT, b"first")])
+
+    def test_empty_file_has_no_records(self):
+        open(self.path, "wb").close()
+        with SessionReader(self.path) as session:
+            self.assertIsNone(session.started)
+            self.assertEqual(list(session), [])
+        written = []
+        self.assertEqual(replay(self.path, written.append, speed=0), 0)
+        self.assertEqual(written, [])
+
+    def test_foreign_file_is_rejected(self):
+        with open(self.path, "wb") as f:
+            f.write(HEADER.pack(b"NOPE", 2, 0.0))
+        with self.assertRaises(ValueError):
+            SessionReader(self.path)
+
+    def test_replay_writes_one_direction(self):
+        recorder = SessionRecorder(self.path)
+        for direction, data in [(OUT, b"a"), (IN, b"OK"), (OUT, b"b")]:
+            recorder.record(direction, data, now=recorder.origin)
+        recorder.close()
+        written = []
+        self.assertEqual(replay(self.path, written.append, speed=0), 2)
+        self.assertEqual(written, [b"a", b"b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
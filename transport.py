@@ -0,0 +1,146 @@
+"""
+Transports run the I/O of a SerialSender: opening its port, writing frames
+as the scheduler releases them and passing received bytes back.
+
+- ThreadTransport: a writer and a reader thread per port (works everywhere).
+- AsyncioTransport: see asyncio_transport.py.
+
+After a failure, both reopen the port with exponential backoff for as long
+as the sender is running; the backoff starts over once a reopened link has
+written or read successfully. A transport only touches the sender through its
+underscore helpers (_open_port, _backoff, _serving, _next_due, _frame,
+_sent, _received, _fail).
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+
+
+class Transport(ABC):
+    """Interface every transport implements; start() is required."""
+
+    def __init__(self, sender):
+        self.sender = sender
+
+    @abstractmethod
+    def start(self):
+        """Open the port and start serving the sender."""
+
+    def wake(self):
+        """Queue or running state changed. Called with sender.cond held."""
+
+    def join(self, timeout=None):
+        """Wait for the transport to finish after the sender stopped."""
+
+
+class ThreadTransport(Transport):
+    """Writer thread waits on the sender's condition, reader thread blocks
+    on the port until bytes arrive."""
+
+    def __init__(self, sender):
+        super().__init__(sender)
+        self.thread = None
+        self.reader = None
+        self.worked = False     # the current link wrote or read successfully
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def wake(self):
+        ser = self.sender.ser
+        if not self.sender._serving() and ser and ser.is_open:
+            try:
+                ser.cancel_read()
+            except Exception:
+                pass
+
+    def join(self, timeout=None):
+        if self.thread:
+            self.thread.join(timeout=timeout)
+
+    def _next_message(self):
+        """Block until a message is due (or the sender stops) and return it.
+
+        Waits on the condition with a monotonic deadline, so the thread only
+        wakes up for new messages, the next paced slot, or stop().
+        """
+        sender = self.sender
+        with sender.cond:
+            while sender._serving():
+                msg, wait = sender._next_due()
+                if msg is not None:
+                    return msg
+                sender.cond.wait(wait)
+            return None
+
+    def _run(self):
+        """Worker thread: (re)open the port and serve it until stopped."""
+        sender = self.sender
+        delays = sender._backoff()
+        while sender.running:
+            # No read timeout: the reader blocks until bytes arrive or
+            # cancel_read() is called from wake().
+            if sender._open_port(timeout=None):
+                self.worked = False
+                with sender.ser:
+                    self.reader = threading.Thread(target=self._read_loop, daemon=True)
+                    self.reader.start()
+                    self._write_loop()
+                    self.wake()
+                    self.reader.join(timeout=2)
+                if self.worked:
+                    delays = sender._backoff()
+            # A port that opens but fails at once backs off like one that
+            # does not open at all.
+            with sender.cond:
+                sender.cond.wait_for(lambda: not sender.running, next(delays))
+        sender.log_debug("SerialSender thread exited")
+
+    def _write_loop(self):
+        """Send messages as they become due, until stopped or the link fails."""
+        sender = self.sender
+        while True:
+            msg = self._next_message()
+            if msg is None:
+                break
+            frame = sender._frame(msg)
+            write_start = time.monotonic()
+            try:
+                sender.ser.write(frame)
+            except Exception as e:
+                sender._fail("write", e, msg)
+                break
+            self.worked = True
+            sender._sent(msg, write_start, len(frame))
+
+    def _read_loop(self):
+        """Reader thread: block on the port and pass on whatever arrives."""
+        sender = self.sender
+        while sender._serving():
+            try:
+                data = sender.ser.read(max(1, sender.ser.in_waiting))
+            except Exception as e:
+                if sender._serving():
+                    sender._fail("read", e)
+                break
+            if data:
+                self.worked = True
+            sender._received(data)
+
+
+def transport_class(backend):
+    """The Transport class for backend ("thread" or "asyncio").
+
+    asyncio_transport is imported on first use only: asyncio alone costs
+    tens of milliseconds of start-up time.
+    """
+    if backend == "asyncio":
+        from asyncio_transport import AsyncioTransport
+        return AsyncioTransport
+    return TRANSPORTS[backend]
+
+
+TRANSPORTS = {
+    "thread": ThreadTransport,
+}